@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# Control loop benchmarks: IK, trajectories, packet encoding and full frames
+import argparse
+import json
+import platform
+import subprocess
+import time
+import timeit
+import numpy as np
+from lx16a_driver import LX16ADriver
+from gait_controller import GaitController
+from inverse_kinematics import LegIK, QuadrupedIK
+from ik_lookup import IKLookupTable
+from trajectory import BezierTrajectory
+from robot_config import SERVO_MAP, LEG_DIMENSIONS, WALK_CONFIG
+
+class NullSerial:
+    """Serial port stand-in that discards everything written to it"""
+    is_open = True
+    in_waiting = 0
+    
+    def __init__(self):
+        self.bytes_written = 0
+    
+    def write(self, data):
+        self.bytes_written += len(data)
+        return len(data)
+    
+    def read(self, size=1):
+        return b''
+    
+    def reset_input_buffer(self):
+        pass
+    
+    def close(self):
+        self.is_open = False
+
+def bench(fn, repeat=5):
+    """Best time per call (seconds) of fn over repeat timed runs"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat, number)) / number
+    return {
+        'mean_us': best * 1e6,
+        'ops_per_sec': 1.0 / best if best > 0 else float('inf'),
+        'iterations': number
+    }
+
+def frame_rate(step, frames):
+    """Frames per second of calling step(i) for frames frames"""
+    start = time.perf_counter()
+    for i in range(frames):
+        step(i)
+    elapsed = time.perf_counter() - start
+    return {
+        'frames': frames,
+        'fps': frames / elapsed,
+        'frame_us': elapsed / frames * 1e6
+    }
+
+def make_controller(baudrate=115200):
+    """GaitController on a NullSerial port; baudrate None disables bus pacing"""
+    driver = LX16ADriver(baudrate=baudrate or float('inf'), transport=NullSerial())
+    return GaitController(driver)
+
+def micro_benchmarks(repeat):
+    results = {}
+    leg_ik = LegIK(LEG_DIMENSIONS['thigh_length'], LEG_DIMENSIONS['shin_length'])
+    quadruped_ik = QuadrupedIK(leg_ik, LEG_DIMENSIONS['body_width'], LEG_DIMENSIONS['body_length'])
+    body_height = WALK_CONFIG['body_height']
+    
+    phases = np.linspace(0, 1, 1000, endpoint=False)
+    xs, zs = leg_ik.foot_trajectory_batch(40, 20, phases)
+    zs = zs + body_height
+    
+    results['ik.calculate_angles'] = bench(lambda: leg_ik.calculate_angles(10.0, body_height), repeat)
+    results['ik.calculate_angles_batch_1000'] = bench(lambda: leg_ik.calculate_angles_batch(xs, zs), repeat)
+    lookup = IKLookupTable.build(leg_ik)
+    results['ik.lookup_angles'] = bench(lambda: lookup.angles(10.0, body_height), repeat)
+    results['ik.lookup_interpolate_1000'] = bench(lambda: lookup.interpolate(xs, zs), repeat)
+    results['ik.calculate_leg_angles'] = bench(
+        lambda: quadruped_ik.calculate_leg_angles('front_left', 10.0, body_height), repeat)
+    results['trajectory.foot_trajectory'] = bench(lambda: leg_ik.foot_trajectory(40, 20, 0.3), repeat)
+    results['trajectory.foot_trajectory_batch_1000'] = bench(
+        lambda: leg_ik.foot_trajectory_batch(40, 20, phases), repeat)
+    bezier = BezierTrajectory(40, 20)
+    results['trajectory.bezier_batch_1000'] = bench(lambda: bezier.evaluate(phases), repeat)
+    
+    controller = make_controller(baudrate=None)
+    driver = controller.driver
+    planner = controller.planner
+    servo_ids = list(SERVO_MAP.values())
+    positions = [500] * len(servo_ids)
+    results['driver.send_command'] = bench(lambda: driver.set_position(1, 500, 20), repeat)
+    results['driver.encode_frame'] = bench(lambda: driver.encoder.encode(servo_ids, positions, 20), repeat)
+    results['driver.set_positions'] = bench(lambda: driver.set_positions(servo_ids, positions, 20), repeat)
+    
+    results['planner.forward_frame'] = bench(lambda: planner.forward_frame(0.3, 'trot'), repeat)
+    gait_table = planner.compile_gait('trot')
+    results['planner.compiled_angles_at'] = bench(lambda: gait_table.angles_dict_at(0.3), repeat)
+    results['planner.compiled_angles_into'] = bench(
+        lambda: gait_table.angles_into(0.3, planner.frame), repeat)
+    results['planner.compile_gait'] = bench(
+        lambda: (planner.compiled_gaits.clear(), planner.compile_gait('trot')), repeat)
+    return results
+
+def end_to_end_benchmarks(frames, baudrate):
+    """Full frames (planning + encoding + write) per second for trot, walk and turn"""
+    results = {}
+    for label, rate in (('cpu', None), ('bus', baudrate)):
+        controller = make_controller(rate)
+        planner = controller.planner
+        
+        def trot(i):
+            controller.set_multiple(planner.forward_frame((i % 100) / 100, 'trot'), 20)
+        
+        def walk(i):
+            controller.set_multiple(planner.forward_frame((i % 100) / 100, 'walk'), 20)
+        
+        def turn(i):
+            controller.set_multiple(planner.turn_frame((i % 100) / 100, 'left'), 20)
+        
+        for name, step in (('trot', trot), ('walk', walk), ('turn', turn)):
+            results[f'frame.{name}.{label}'] = frame_rate(step, frames)
+    return results
+
+def metadata(baudrate):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True).stdout.strip()
+    except Exception:
+        commit = ''
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'baudrate': baudrate
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the quadruped control loop")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON results file")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per microbenchmark")
+    parser.add_argument('--frames', type=int, default=2000, help="Frames per end-to-end benchmark")
+    parser.add_argument('--baudrate', type=int, default=115200, help="Bus speed for paced frames")
+    args = parser.parse_args()
+    
+    results = micro_benchmarks(args.repeat)
+    results.update(end_to_end_benchmarks(args.frames, args.baudrate))
+    
+    for name, result in results.items():
+        if 'fps' in result:
+            print(f"{name:40s} {result['fps']:12.1f} fps  {result['frame_us']:10.1f} us/frame")
+        else:
+            print(f"{name:40s} {result['ops_per_sec']:12.1f} ops/s {result['mean_us']:10.2f} us/op")
+    
+    with open(args.output, 'w') as f:
+        json.dump({'meta': metadata(args.baudrate), 'results': results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 # Servo Calibration Tool
+import sys
 import time
 from lx16a_driver import LX16ADriver
-from robot_config import SERVO_MAP
+from robot_config import SERVO_MAP, NEUTRAL_ANGLES, SERVO_MAX_SPEED
+from servo_commands import save_calibration, default_calibration
 
 def calibrate_servo(driver, servo_name, servo_id):
     print(f"\n=== Calibrating {servo_name} (ID: {servo_id}) ===")
@@ -77,18 +79,200 @@ def find_limits(driver, servo_id, servo_name):
     print(f"{servo_name} limits: {lower_limit}° to {upper_limit}°")
     return lower_limit, upper_limit
 
+class LimitSearch:
+    def __init__(self, start, bound, resolution=1.0):
+        """
+        Binary search for one joint stop between a reachable start angle and a bound
+        The first move goes halfway, so the joint approaches its stop gradually.
+        """
+        self.start = start
+        self.reached = start       # Furthest commanded angle reached within tolerance
+        self.blocked = bound       # Nearest commanded angle known to be blocked
+        self.bound = bound
+        self.resolution = resolution
+        self.stall_angle = None    # Measured angle where the joint stalled, nearest the start
+        self.answered = False
+    
+    @property
+    def done(self):
+        return abs(self.blocked - self.reached) <= self.resolution
+    
+    @property
+    def limit(self):
+        """Reachable limit: the stall position if a stop was hit, otherwise the bound"""
+        if self.stall_angle is None:
+            return self.bound
+        # A command within tolerance past the stop still counts as reached
+        return min(self.reached, self.stall_angle, key=lambda a: abs(a - self.start))
+    
+    def next_angle(self):
+        return (self.reached + self.blocked) / 2
+    
+    def update(self, angle, reached, measured):
+        """Record whether the joint reached the commanded angle (within tolerance)"""
+        self.answered = True
+        if reached:
+            self.reached = angle
+        else:
+            self.blocked = angle
+            nearer = self.stall_angle is None or \
+                abs(measured - self.start) < abs(self.stall_angle - self.start)
+            if nearer:
+                self.stall_angle = measured
+
+def move_and_measure(driver, targets, current, speed=SERVO_MAX_SPEED / 2,
+                     poll=0.05, stable=1, timeout=2.0):
+    """
+    Move servos together and read back where they stop
+    targets, current: dict servo_id -> commanded / last angle (degrees)
+    A servo has stopped when its position changes by no more than stable units
+    between two polls; a stalled servo stops short of its target.
+    Returns: dict servo_id -> measured angle (None if the servo did not answer)
+    """
+    ids = list(targets)
+    move_time = max(100, int(max(abs(targets[i] - current[i]) for i in ids) / speed * 1000))
+    driver.set_angles(ids, [targets[i] for i in ids], move_time)
+    time.sleep(move_time / 1000.0)
+    
+    deadline = time.monotonic() + timeout
+    previous = driver.read_positions(ids)
+    while time.monotonic() < deadline:
+        time.sleep(poll)
+        positions = driver.read_positions(ids)
+        # Servos missing a reply are retried by the caller, not waited for
+        settled = all(p is None or q is None or abs(p - q) <= stable
+                      for p, q in zip(positions.values(), previous.values()))
+        previous = positions
+        if settled:
+            break
+    return {i: None if p is None else driver.position_to_angle(p) for i, p in previous.items()}
+
+def auto_find_limits(driver, servos=None, start_angle=90, resolution=1.0, tolerance=2.0,
+                     max_steps=20):
+    """
+    Find the joint stops of all servos at once by position readback
+    Every servo runs its own binary search toward 0 and then 240 degrees; each step
+    is one frame for all servos followed by a pipelined position read. A servo that
+    ends more than tolerance degrees from its command has hit a stop.
+    servos: dict servo_name -> servo_id (default SERVO_MAP)
+    Returns: dict servo_name -> (lower, upper) reachable angles in degrees, without
+    the servos that did not answer or whose search did not converge
+    """
+    ids = dict(SERVO_MAP if servos is None else servos)
+    
+    # Only search servos that answer
+    positions = driver.read_positions(list(ids.values()))
+    for name, servo_id in list(ids.items()):
+        if positions.get(servo_id) is None:
+            print(f"{name}: no position reply, skipped")
+            del ids[name]
+    if not ids:
+        return {}
+    
+    # Start from an angle every joint can reach
+    start = {servo_id: start_angle for servo_id in ids.values()}
+    current = {i: driver.position_to_angle(positions[i]) for i in start}
+    move_and_measure(driver, start, current)
+    current = dict(start)
+    
+    found = {}
+    failed = set()
+    for bound in (0, 240):
+        searches = {name: LimitSearch(start_angle, bound, resolution) for name in ids}
+        for step in range(max_steps):
+            active = [name for name, search in searches.items() if not search.done]
+            if not active:
+                break
+            targets = {ids[name]: searches[name].next_angle() for name in active}
+            measured = move_and_measure(driver, targets, current)
+            
+            backoff = {}
+            for name in active:
+                servo_id = ids[name]
+                angle = measured[servo_id]
+                if angle is None:
+                    print(f"{name}: no position reply, retrying")
+                    continue
+                reached = abs(angle - targets[servo_id]) <= tolerance
+                searches[name].update(targets[servo_id], reached, angle)
+                current[servo_id] = angle
+                if not reached:
+                    # Stop pushing against the stop
+                    backoff[servo_id] = searches[name].reached
+            if backoff:
+                move_and_measure(driver, backoff, current)
+                current.update(backoff)
+        
+        for name, search in searches.items():
+            if not search.answered:
+                print(f"{name}: no position reply, skipped")
+                failed.add(name)
+            elif not search.done:
+                print(f"{name}: search toward {bound}° did not converge, skipped")
+                failed.add(name)
+            lower, upper = found.get(name, (None, None))
+            if bound == 0:
+                found[name] = (search.limit, upper)
+            else:
+                found[name] = (lower, search.limit)
+        
+        # Back to the start angle before searching the other direction
+        targets = {servo_id: start_angle for servo_id in ids.values()}
+        move_and_measure(driver, targets, current)
+        current.update(targets)
+    
+    return {name: limits for name, limits in found.items() if name not in failed}
+
+def auto_calibrate(driver, servos=None, margin=2.0, path=None, **kwargs):
+    """
+    Find limits automatically (auto_find_limits) and save them for ServoCommandStage
+    Limits are kept margin degrees inside any stop that was found and never widen the
+    configured ANGLE_LIMITS; servos without a result keep their calibration.
+    """
+    servos = dict(SERVO_MAP if servos is None else servos)
+    start = time.monotonic()
+    limits = auto_find_limits(driver, servos, **kwargs)
+    print(f"\n=== SERVO LIMITS (found in {time.monotonic() - start:.1f} s) ===")
+    
+    updates = {}
+    for servo_name, (lower, upper) in limits.items():
+        lower = lower + margin if lower > 0 else lower
+        upper = upper - margin if upper < 240 else upper
+        configured = default_calibration(servo_name)
+        lower = max(lower, configured['min'])
+        upper = min(upper, configured['max'])
+        if lower >= upper:
+            print(f"{servo_name}: no usable range ({lower:.1f}° to {upper:.1f}°), skipped")
+            continue
+        print(f"{servo_name}: {lower:.1f}° to {upper:.1f}°")
+        updates[servo_name] = {'min': round(lower, 1), 'max': round(upper, 1)}
+    skipped = [name for name in servos if name not in updates]
+    if skipped:
+        print(f"Not calibrated: {', '.join(skipped)}")
+    if updates:
+        save_calibration(updates, path)
+    return updates
+
 if __name__ == "__main__":
-    driver = LX16ADriver()
+    # Optional port argument ('emulator' runs against the emulated bus)
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    port = args[0] if args else '/dev/ttyUSB0'
+    driver = LX16ADriver(port)
     
     print("=== QUADRUPED ROBOT SERVO CALIBRATION ===")
     print("1. Manual angle calibration")
     print("2. Find servo limits")
+    print("3. Find servo limits automatically (position readback)")
     
-    choice = input("Select option (1 or 2): ").strip()
+    choice = '3' if '--auto' in sys.argv else input("Select option (1, 2 or 3): ").strip()
     
     if choice == '1':
+        # The final angle is where the servo holds the joint at its neutral pose
+        offsets = {}
         for servo_name, servo_id in SERVO_MAP.items():
-            calibrate_servo(driver, servo_name, servo_id)
+            angle = calibrate_servo(driver, servo_name, servo_id)
+            offsets[servo_name] = {'offset': angle - NEUTRAL_ANGLES[servo_name]}
+        save_calibration(offsets)
     elif choice == '2':
         limits = {}
         for servo_name, servo_id in SERVO_MAP.items():
@@ -98,6 +282,10 @@ if __name__ == "__main__":
         print("\n=== SERVO LIMITS SUMMARY ===")
         for servo_name, (lower, upper) in limits.items():
             print(f"{servo_name}: {lower}° to {upper}°")
+        save_calibration({name: {'min': lower, 'max': upper}
+                          for name, (lower, upper) in limits.items()})
+    elif choice == '3':
+        auto_calibrate(driver)
     
     # Return to neutral
     print("\nReturning all servos to neutral...")
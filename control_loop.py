@@ -0,0 +1,82 @@
+import time
+from collections import deque
+
+class FixedRateScheduler:
+    def __init__(self, rate_hz=50, history=500):
+        """
+        Fixed-rate control loop timing against absolute monotonic deadlines
+        rate_hz: control ticks per second
+        history: number of recent per-tick jitter samples kept
+        """
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.jitter = deque(maxlen=history)
+        self.reset()
+    
+    @property
+    def move_time(self):
+        """Servo move time (ms) matching one tick period"""
+        return max(1, int(round(self.period * 1000)))
+    
+    def reset(self):
+        """Clear timing statistics"""
+        self.start_time = None
+        self.tick = 0
+        self.overruns = 0
+        self.dropped_frames = 0
+        self.max_jitter = 0.0
+        self.jitter.clear()
+    
+    def start(self):
+        """Start the schedule; tick 0 is due immediately"""
+        self.reset()
+        self.start_time = time.monotonic()
+        return self.start_time
+    
+    def elapsed(self):
+        """Seconds since start according to the tick schedule"""
+        return self.tick * self.period
+    
+    def wait(self):
+        """
+        Sleep until the next tick deadline
+        If the frame overran its period, skip the missed ticks (dropped frames)
+        and realign to the schedule instead of drifting.
+        Returns the scheduled time of the new tick (seconds since start)
+        """
+        deadline = self.start_time + (self.tick + 1) * self.period
+        now = time.monotonic()
+        
+        if now > deadline:
+            self.overruns += 1
+            missed = int((now - deadline) / self.period)
+            self.dropped_frames += missed
+            self.tick += missed + 1
+            lateness = now - (self.start_time + self.tick * self.period)
+        else:
+            time.sleep(deadline - now)
+            self.tick += 1
+            lateness = time.monotonic() - deadline
+        
+        self.jitter.append(lateness)
+        self.max_jitter = max(self.max_jitter, lateness)
+        return self.elapsed()
+    
+    def stats(self):
+        """Timing statistics for the current run"""
+        jitter = sorted(self.jitter)
+        return {
+            'rate_hz': self.rate_hz,
+            'ticks': self.tick,
+            'overruns': self.overruns,
+            'dropped_frames': self.dropped_frames,
+            'jitter_p50_ms': jitter[len(jitter) // 2] * 1000 if jitter else 0.0,
+            'jitter_max_ms': self.max_jitter * 1000
+        }
+    
+    def report(self):
+        """Print timing statistics"""
+        s = self.stats()
+        print(f"Control loop {s['rate_hz']} Hz: {s['ticks']} ticks, "
+              f"{s['overruns']} overruns, {s['dropped_frames']} dropped frames, "
+              f"jitter p50 {s['jitter_p50_ms']:.2f} ms, max {s['jitter_max_ms']:.2f} ms")
@@ -0,0 +1,97 @@
+import os
+import struct
+import time
+import numpy as np
+from robot_config import SERVO_MAP
+from inverse_kinematics import JOINT_NAMES, LEG_NAMES
+
+# File header: magic, version, record size (bytes), wall-clock start time
+HEADER = struct.Struct('<4sHHd')
+MAGIC = b'QDFR'
+VERSION = 1
+
+# One fixed-size record per commanded frame
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),                      # Seconds since recording start
+    ('phase', '<f4'),                          # Gait cycle phase 0 to 1
+    ('feet', '<f4', (len(LEG_NAMES), 2)),      # Foot (x, z) targets in mm, LEG_NAMES order
+    ('angles', '<f4', (len(JOINT_NAMES),)),    # Joint angles in degrees, JOINT_NAMES order
+    ('positions', '<u2', (len(JOINT_NAMES),)), # Quantized servo positions 0-1000
+    ('move_time', '<u2')                       # Servo move time in ms
+])
+
+class FrameRecorder:
+    def __init__(self, path):
+        """Append commanded frames to a fixed-record binary file"""
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize, time.time()))
+        self.start = time.monotonic()
+        self.frames = 0
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+    
+    def record(self, phase, feet, angles, positions, move_time):
+        """
+        Append one frame
+        feet: (4, 2) foot targets; angles/positions: 8 values in JOINT_NAMES order
+        """
+        rec = self._record[0]
+        rec['timestamp'] = time.monotonic() - self.start
+        rec['phase'] = phase
+        rec['feet'] = feet
+        rec['angles'] = angles
+        rec['positions'] = positions
+        rec['move_time'] = move_time
+        self.file.write(self._record.tobytes())
+        self.frames += 1
+    
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+            print(f"Recorded {self.frames} frames to {self.path}")
+
+def load_recording(path):
+    """
+    Memory-map a recording without parsing it
+    A partly written last record (recorder interrupted mid-write) is ignored.
+    Returns: read-only structured array of RECORD_DTYPE records
+    """
+    with open(path, 'rb') as f:
+        magic, version, record_size, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a version {VERSION} frame recording")
+    
+    count, tail = divmod(os.path.getsize(path) - HEADER.size, RECORD_DTYPE.itemsize)
+    if tail:
+        print(f"Warning: {path} ends in a partial record, ignoring its last {tail} bytes")
+    if count == 0:
+        # Nothing to map (mmap cannot map zero bytes)
+        frames = np.zeros(0, dtype=RECORD_DTYPE)
+        frames.flags.writeable = False
+        return frames
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+
+def recording_start_time(path):
+    """Wall-clock time (epoch seconds) the recording started"""
+    with open(path, 'rb') as f:
+        return HEADER.unpack(f.read(HEADER.size))[3]
+
+def replay(path, driver, speed=1.0, synchronized=False):
+    """
+    Stream a recording's quantized positions to an LX16ADriver
+    speed: playback rate relative to the original timing; 0 sends as fast as possible
+    """
+    frames = load_recording(path)
+    servo_ids = [SERVO_MAP[name] for name in JOINT_NAMES]
+    print(f"Replaying {len(frames)} frames from {path} at {speed}x")
+    
+    start = time.monotonic()
+    first = float(frames[0]['timestamp']) if len(frames) else 0.0
+    for rec in frames:
+        if speed > 0:
+            delay = start + (float(rec['timestamp']) - first) / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        move_time = int(rec['move_time'] / speed) if speed > 0 else int(rec['move_time'])
+        driver.set_positions(servo_ids, rec['positions'].tolist(), max(1, move_time), synchronized)
+    return len(frames)
@@ -1,50 +1,268 @@
 import time
+from array import array
 from robot_config import SERVO_MAP, NEUTRAL_ANGLES
-from inverse_kinematics import LegIK
-from gait_planner import GaitPlanner
+from control_loop import FixedRateScheduler
+from motion_file import MotionFile, motion_path
 
 class GaitController:
     def __init__(self, servo_driver):
         self.driver = servo_driver
         self.servo_map = SERVO_MAP
+        self.synchronized = False  # Start all joints of a frame on one broadcast packet
         
-        # Initialize IK and gait planner
-        from robot_config import LEG_DIMENSIONS
-        leg_ik = LegIK(
-            thigh_length=LEG_DIMENSIONS['thigh_length'],
-            shin_length=LEG_DIMENSIONS['shin_length']
-        )
-        self.planner = GaitPlanner(self, leg_ik)
+        # Calibration, angle limits and quantization for every command (built on first use)
+        self._command_stage = None
+        
+        # Delta suppression: skip servos whose quantized command has not changed
+        self.delta_suppression = True
+        self.deadband = 0            # Position units (0-1000) treated as unchanged
+        self.refresh_interval = 1.0  # Seconds after which a command is resent anyway
+        # Last command of each joint (JOINT_NAMES order), position -1 when not sent
+        self.last_positions = array('i', [-1] * len(SERVO_MAP))
+        self.last_move_times = array('i', [0] * len(SERVO_MAP))
+        self.last_sent = array('d', [0.0] * len(SERVO_MAP))
+        self.commands_sent = 0
+        self.commands_skipped = 0
+        
+        # Per-stage timing, see enable_instrumentation
+        self.instrumentation = None
+        
+        # Memory-mapped precompiled motions, kept open for instant switching
+        self.motions = {}
+        
+        # IK and gait planner are built on first use, so NumPy is not imported at startup
+        self._planner = None
+        
+        # Background steerable gait loop (gait_runtime.GaitRuntime), None when not running
+        self.runtime = None
+    
+    @property
+    def planner(self):
+        """GaitPlanner, created on first use"""
+        if self._planner is None:
+            # Initialize IK and gait planner
+            from robot_config import LEG_DIMENSIONS
+            from inverse_kinematics import LegIK
+            from gait_planner import GaitPlanner
+            leg_ik = LegIK(
+                thigh_length=LEG_DIMENSIONS['thigh_length'],
+                shin_length=LEG_DIMENSIONS['shin_length']
+            )
+            self._planner = GaitPlanner(self, leg_ik)
+            self._planner.instrumentation = self.instrumentation
+        return self._planner
+    
+    @property
+    def command_stage(self):
+        """ServoCommandStage loaded from the calibration file, created on first use"""
+        if self._command_stage is None:
+            from servo_commands import ServoCommandStage
+            self._command_stage = ServoCommandStage.from_file()
+        return self._command_stage
     
     def set_servo(self, servo_name, angle, move_time=1000):
         """Set individual servo by name"""
-        servo_id = self.servo_map[servo_name]
-        self.driver.set_angle(servo_id, angle, move_time)
+        (servo_id,), (position,) = self.command_stage.command({servo_name: angle})
+        self.select_commands((self.command_stage.index[servo_name],), (servo_id,), (position,),
+                             move_time, time.monotonic(), [0], [0], suppress=False)
+        self.commands_sent += 1
+        self.driver.set_position(servo_id, position, move_time)
+    
+    def select_commands(self, indices, servo_ids, positions, move_time, now,
+                        send_ids, send_positions, suppress=None):
+        """
+        Delta suppression: drop joints last sent the same command recently, remember the rest
+        indices: joint index (command stage order) of each of servo_ids/positions
+        send_ids/send_positions: buffers the commands to send are written to
+        suppress: default self.delta_suppression; False only remembers the commands
+        Returns: number of commands written to send_ids/send_positions
+        """
+        suppress = self.delta_suppression if suppress is None else suppress
+        last_positions = self.last_positions
+        last_move_times = self.last_move_times
+        last_sent = self.last_sent
+        deadband = self.deadband
+        refresh_interval = self.refresh_interval
+        count = 0
+        for i in range(len(positions)):
+            index = indices[i]
+            position = positions[i]
+            last = last_positions[index]
+            if (suppress and last >= 0 and abs(position - last) <= deadband
+                    and move_time == last_move_times[index]
+                    and now - last_sent[index] < refresh_interval):
+                continue
+            last_positions[index] = position
+            last_move_times[index] = move_time
+            last_sent[index] = now
+            send_ids[count] = servo_ids[i]
+            send_positions[count] = position
+            count += 1
+        self.commands_skipped += len(positions) - count
+        return count
+    
+    def set_multiple(self, servo_angles, move_time=1000, synchronized=None):
+        """
+        Set multiple servos simultaneously with a single frame write
+        servo_angles: JointFrame (see set_frame) or dict of angles keyed by servo name
+        synchronized: wait-write + broadcast start (default: self.synchronized)
+        """
+        if not isinstance(servo_angles, dict):
+            self.set_frame(servo_angles, move_time, synchronized)
+            return
+        synchronized = self.synchronized if synchronized is None else synchronized
+        instr = self.instrumentation
+        if instr:
+            start = instr.now()
+        now = time.monotonic()
+        
+        stage = self.command_stage
+        frame_ids, frame_positions = stage.command(servo_angles)
+        if instr:
+            instr.record('command_stage', start)
+        indices = [stage.index[servo_name] for servo_name in servo_angles]
+        servo_ids = [0] * len(frame_ids)
+        positions = [0] * len(frame_ids)
+        count = self.select_commands(indices, frame_ids, frame_positions, move_time, now,
+                                     servo_ids, positions)
+        
+        if count:
+            self.commands_sent += count
+            self.driver.set_positions(servo_ids[:count], positions[:count], move_time, synchronized)
+        if instr:
+            instr.record('set_multiple', start)
+    
+    def set_frame(self, frame, move_time=1000, synchronized=None):
+        """
+        Send a JointFrame (all joints) without per-tick allocation
+        Positions and the servos left after delta suppression are written into the
+        frame's own buffers, which the driver encodes from directly.
+        """
+        synchronized = self.synchronized if synchronized is None else synchronized
+        instr = self.instrumentation
+        if instr:
+            start = instr.now()
+        now = time.monotonic()
+        
+        positions = self.command_stage.command_frame(frame)
+        if instr:
+            instr.record('command_stage', start)
+        count = self.select_commands(range(len(positions)), frame.servo_ids, positions, move_time,
+                                     now, frame.send_ids, frame.send_positions)
+        frame.count = count
+        
+        if count:
+            self.commands_sent += count
+            self.driver.set_positions(frame.send_ids, frame.send_positions, move_time,
+                                      synchronized, count)
+        if instr:
+            instr.record('set_multiple', start)
+    
+    def enable_instrumentation(self, size=1024):
+        """Record per-stage timings across planner, controller and driver"""
+        from instrumentation import Instrumentation
+        self.instrumentation = Instrumentation(size)
+        if self._planner is not None:
+            self._planner.instrumentation = self.instrumentation
+        self.driver.instrumentation = self.instrumentation
+        return self.instrumentation
+    
+    def disable_instrumentation(self):
+        """Stop recording timings; the hot path goes back to a single falsy check"""
+        self.instrumentation = None
+        if self._planner is not None:
+            self._planner.instrumentation = None
+        self.driver.instrumentation = None
+    
+    def invalidate_commands(self):
+        """Forget the last commanded positions so the next frame is sent in full"""
+        for index in range(len(self.last_positions)):
+            self.last_positions[index] = -1
+    
+    def start_runtime(self, gait_type='trot'):
+        """
+        Run the gait continuously in the background, steered with set_velocity/set_gait
+        Returns the GaitRuntime; blocking maneuvers stop it first.
+        """
+        if self.runtime is None:
+            from gait_runtime import GaitRuntime
+            self.runtime = GaitRuntime(self.planner, gait_type).start()
+        return self.runtime
+    
+    def stop_runtime(self):
+        """Bring the background gait to a standstill and stop it"""
+        if self.runtime is not None:
+            self.runtime.stop()
+            self.runtime = None
     
-    def set_multiple(self, servo_angles, move_time=1000):
-        """Set multiple servos simultaneously"""
-        for servo_name, angle in servo_angles.items():
-            self.set_servo(servo_name, angle, move_time)
+    def set_velocity(self, speed=None, turn_rate=None):
+        """
+        Steer the background gait (started if needed); applied on the next control tick
+        speed: forward speed like walk_forward (negative walks backward)
+        turn_rate: -1 to 1, positive turns left
+        """
+        self.start_runtime().set_velocity(speed, turn_rate)
+    
+    def set_gait(self, gait_type):
+        """Switch the background gait at the next cycle boundary"""
+        self.start_runtime(gait_type).set_gait(gait_type)
+    
+    def play_motion(self, name, loops=1):
+        """
+        Stream a precompiled motion (motion_compiler.py) straight to the driver
+        name: motion name in MOTION_DIR or a motion file path
+        """
+        self.stop_runtime()
+        motion = self.motions.get(name)
+        if motion is None:
+            motion = self.motions[name] = MotionFile(motion_path(name))
+        
+        scheduler = FixedRateScheduler(1000.0 / motion.frame_period)
+        scheduler.start()
+        for _ in range(loops):
+            for index in range(len(motion)):
+                self.driver.set_positions(motion.servo_ids, motion.frame(index),
+                                          motion.move_time, self.synchronized)
+                scheduler.wait()
+        
+        # Frames bypassed delta suppression, so its record is stale
+        self.invalidate_commands()
+    
+    def close_motions(self):
+        """Unmap all loaded motion files"""
+        for motion in self.motions.values():
+            motion.close()
+        self.motions.clear()
     
     def neutral_position(self):
         """Stand using IK calculated position"""
+        self.stop_runtime()
         self.planner.stand()
     
+    def set_body_pose(self, roll=0, pitch=0, yaw=0, body_height=None):
+        """Tilt/rotate the body (degrees) while standing"""
+        self.stop_runtime()
+        return self.planner.body_pose(roll, pitch, yaw, body_height)
+    
     def walk_forward(self, steps=3, speed=1.0, gait_type='trot'):
         """Walk forward using proper gait planning"""
+        self.stop_runtime()
         duration = steps * 2.0  # 2 seconds per step
         self.planner.move_forward(speed=speed, gait_type=gait_type, duration=duration)
     
     def turn_left(self, angle=30, duration=3.0):
         """Turn left using gait planning"""
+        self.stop_runtime()
         self.planner.turn('left', angle, duration)
     
     def turn_right(self, angle=30, duration=3.0):
         """Turn right using gait planning"""
+        self.stop_runtime()
         self.planner.turn('right', angle, duration)
     
     def sit(self):
         """Sit down"""
+        self.stop_runtime()
         self.planner.sit()
     
     def test_leg_ik(self, leg_name, x, z):
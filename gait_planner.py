@@ -1,6 +1,67 @@
-import time
 import math
+from collections import OrderedDict
+import numpy as np
 from robot_config import SERVO_MAP, WALK_CONFIG, LEG_DIMENSIONS
+from inverse_kinematics import LEG_NAMES, JOINT_NAMES
+from control_loop import FixedRateScheduler
+from trajectory import BezierTrajectory
+from joint_frame import JointFrame
+
+# Per-leg phase offsets for each gait, in LEG_NAMES order
+GAIT_PHASE_OFFSETS = {
+    'trot': (0.0, 0.5, 0.5, 0.0),
+    'walk': (0.5, 0.0, 0.25, 0.75)
+}
+
+class CompiledGait:
+    def __init__(self, gait_type, table, feet=None, clamped=None):
+        """
+        One gait cycle sampled into a joint-angle table
+        table: (N phases x 8 joints) array of angles in degrees, columns in JOINT_NAMES order
+        feet: optional (N phases x 4 legs x 2) foot (x, z) targets the table was solved for
+        clamped: optional (N phases x 4 legs) mask of targets IK could not reach exactly
+        """
+        self.gait_type = gait_type
+        self.table = table
+        self.feet = feet
+        self.clamped = clamped
+        self.samples = len(table)
+    
+    def angles_at(self, phase):
+        """Interpolate joint angles (degrees, JOINT_NAMES order) at phase 0 to 1"""
+        position = (phase % 1.0) * self.samples
+        index = int(position)
+        frac = position - index
+        row = self.table[index]
+        next_row = self.table[(index + 1) % self.samples]
+        return row + (next_row - row) * frac
+    
+    def sample(self, num_frames):
+        """Interpolated angles at num_frames evenly spaced phases, (num_frames x 8)"""
+        position = np.arange(num_frames) * (self.samples / num_frames)
+        index = position.astype(int) % self.samples
+        frac = (position - np.floor(position))[:, None]
+        row = self.table[index]
+        return row + (self.table[(index + 1) % self.samples] - row) * frac
+    
+    def angles_into(self, phase, frame):
+        """Interpolate joint angles at phase straight into a JointFrame"""
+        position = (phase % 1.0) * self.samples
+        index = int(position)
+        row = self.table[index]
+        out = frame.angle_view
+        np.subtract(self.table[(index + 1) % self.samples], row, out=out)
+        out *= position - index
+        out += row
+        return frame
+    
+    def angles_dict_at(self, phase):
+        """Interpolated joint angles keyed by servo name"""
+        return dict(zip(JOINT_NAMES, self.angles_at(phase).tolist()))
+    
+    def feet_at(self, phase):
+        """Foot (x, z) targets (4 x 2, LEG_NAMES order) at the nearest sampled phase"""
+        return self.feet[int((phase % 1.0) * self.samples) % self.samples]
 
 class GaitPlanner:
     def __init__(self, gait_controller, leg_ik):
@@ -14,6 +75,34 @@ class GaitPlanner:
         self.step_period = 2.0  # seconds per complete step cycle
         self.body_height = WALK_CONFIG['body_height']
         
+        # Fixed-rate control loop (stats of the last run stay available)
+        self.scheduler = FixedRateScheduler(WALK_CONFIG['control_rate'])
+        
+        # Foot trajectory: 'linear' (LegIK.foot_trajectory) or 'bezier' (BezierTrajectory)
+        self.trajectory_type = 'linear'
+        self.trajectories = OrderedDict()
+        
+        # Compiled gait tables (bounded LRU cache)
+        self.use_compiled_gaits = False
+        self.gait_samples = 256
+        self.gait_cache_size = 8
+        self.compiled_gaits = OrderedDict()
+        
+        # Per-stage timing (instrumentation.Instrumentation), None when disabled
+        self.instrumentation = None
+        
+        # Feasibility check of each gait cycle before it runs (motion_validator)
+        self.validate_plans = True
+        self.reject_infeasible = False  # Refuse to run plans that fail the check
+        self.validated = OrderedDict()  # Last reports by (gait table, step time)
+        
+        # Frame recording (frame_recorder.FrameRecorder), None when not recording
+        self.recorder = None
+        self.last_feet = [[0.0, 0.0] for _ in LEG_NAMES]  # Foot (x, z) targets of the last frame
+        
+        # Joint frame reused by every tick of move_forward/turn
+        self.frame = JointFrame()
+        
         # Initialize quadruped IK
         from inverse_kinematics import QuadrupedIK
         self.quadruped_ik = QuadrupedIK(leg_ik, 
@@ -45,8 +134,8 @@ class GaitPlanner:
         }
         return leg_phases
     
-    def stand(self):
-        """Stand in neutral position using IK"""
+    def stand_angles(self):
+        """Joint angles of the neutral standing pose"""
         angles = {}
         for leg in ['front_left', 'front_right', 'back_left', 'back_right']:
             # Default standing position: foot directly below hip
@@ -55,92 +144,331 @@ class GaitPlanner:
             )
             angles[f'{leg}_hip'] = hip_angle
             angles[f'{leg}_knee'] = knee_angle
-        
-        self.gait.set_multiple(angles, 1000)
+        return angles
+    
+    def stand(self):
+        """Stand in neutral position using IK"""
+        self.gait.set_multiple(self.stand_angles(), 1000)
         print("Standing position set using IK")
     
-    def move_forward(self, speed=1.0, gait_type='trot', duration=5.0):
+    def body_pose(self, roll=0, pitch=0, yaw=0, body_height=None, move_time=1000):
+        """Stand with the body rotated (degrees) and raised/lowered, feet kept below the hips"""
+        body_height = self.body_height if body_height is None else body_height
+        hip, knee, _, _ = self.quadruped_ik.solve_body_pose(
+            self.quadruped_ik.default_feet(), body_height, roll, pitch, yaw
+        )
+        
+        angles = {}
+        for leg, hip_angle, knee_angle in zip(LEG_NAMES, hip.tolist(), knee.tolist()):
+            angles[f'{leg}_hip'] = hip_angle
+            angles[f'{leg}_knee'] = knee_angle
+        
+        self.gait.set_multiple(angles, move_time)
+        return angles
+    
+    def compile_gait(self, gait_type='trot', step_length=None, step_height=None,
+                     body_height=None, x_offsets=(0, 0, 0, 0)):
+        """
+        Sample one gait cycle into a CompiledGait, cached by gait type and parameters
+        x_offsets: per-leg forward foot offset (mm) in LEG_NAMES order
+        """
+        step_length = self.step_length if step_length is None else step_length
+        step_height = self.step_height if step_height is None else step_height
+        body_height = self.body_height if body_height is None else body_height
+        
+        key = (gait_type, self.trajectory_type, step_length, step_height, body_height,
+               tuple(x_offsets), self.gait_samples)
+        compiled = self.compiled_gaits.get(key)
+        if compiled is not None:
+            self.compiled_gaits.move_to_end(key)
+            return compiled
+        
+        # (N, 4) leg phases for N samples of the cycle
+        phases = np.arange(self.gait_samples) / self.gait_samples
+        leg_phases = (phases[:, None] + np.array(GAIT_PHASE_OFFSETS[gait_type])) % 1.0
+        
+        x, z = self.foot_positions(step_length, step_height, leg_phases)
+        feet = np.stack([x + np.asarray(x_offsets, dtype=float), z + body_height], axis=-1)
+        hip, knee, scaled, too_close = self.quadruped_ik.calculate_leg_angles_batch(feet[..., 0], feet[..., 1])
+        
+        table = np.empty((self.gait_samples, len(JOINT_NAMES)))
+        table[:, 0::2] = hip
+        table[:, 1::2] = knee
+        
+        compiled = CompiledGait(gait_type, table, feet, scaled | too_close)
+        self.compiled_gaits[key] = compiled
+        while len(self.compiled_gaits) > self.gait_cache_size:
+            self.compiled_gaits.popitem(last=False)
+        return compiled
+    
+    def validate_gait(self, gait_table, step_time):
+        """
+        Check one cycle of a compiled gait at the control rate (motion_validator)
+        Reports are cached per table and step time. Returns the report.
+        """
+        key = (gait_table, step_time)
+        report = self.validated.get(key)
+        if report is not None:
+            self.validated.move_to_end(key)
+            return report
+        
+        from motion_validator import validate_angles
+        num_frames = max(1, int(round(step_time / self.scheduler.period)))
+        move_time = self.scheduler.move_time
+        synchronized = bool(getattr(self.gait, 'synchronized', False))
+        report = validate_angles(gait_table.sample(num_frames), self.scheduler.period * 1000,
+                                 move_time, cyclic=True, synchronized=synchronized)
+        self.validated[key] = report
+        while len(self.validated) > self.gait_cache_size:
+            self.validated.popitem(last=False)
+        return report
+    
+    def plan_allowed(self, gait_table, step_time):
+        """Validate a gait before running it; False if it fails and reject_infeasible is set"""
+        if not self.validate_plans:
+            return True
+        report = self.validate_gait(gait_table, step_time)
+        if report['feasible']:
+            return True
+        from motion_validator import format_report
+        print(f"Warning: {gait_table.gait_type} plan {format_report(report)}")
+        return not self.reject_infeasible
+    
+    def bezier_trajectory(self, step_length, step_height):
+        """BezierTrajectory for the parameters, cached like compiled gaits"""
+        key = (step_length, step_height)
+        trajectory = self.trajectories.get(key)
+        if trajectory is None:
+            trajectory = BezierTrajectory(step_length, step_height)
+            self.trajectories[key] = trajectory
+            while len(self.trajectories) > self.gait_cache_size:
+                self.trajectories.popitem(last=False)
+        else:
+            self.trajectories.move_to_end(key)
+        return trajectory
+    
+    def foot_position(self, step_length, step_height, phase):
+        """Foot (x, z) at one phase using the selected trajectory type"""
+        if self.trajectory_type == 'bezier':
+            x, z = self.bezier_trajectory(step_length, step_height).evaluate(phase)
+            return float(x), float(z)
+        return self.leg_ik.foot_trajectory(step_length, step_height, phase)
+    
+    def foot_positions(self, step_length, step_height, phases):
+        """Foot (x, z) arrays for an array of phases using the selected trajectory type"""
+        if self.trajectory_type == 'bezier':
+            return self.bezier_trajectory(step_length, step_height).evaluate(phases)
+        return self.leg_ik.foot_trajectory_batch(step_length, step_height, phases)
+    
+    def turn_offsets(self, direction='left'):
+        """Per-leg foot x offsets (mm, LEG_NAMES order) used to turn in place"""
+        turn_factor = 1.0 if direction == 'left' else -1.0
+        return tuple(turn_factor * 20 if 'left' in leg else -turn_factor * 20
+                     for leg in LEG_NAMES)
+    
+    def forward_frame(self, phase, gait_type='trot', frame=None):
+        """
+        Joint angles for one frame of forward walking at the given cycle phase
+        frame: JointFrame filled in place (default: the planner's reused frame)
+        Returns: frame itself, not a copy; the default frame is overwritten on the next call,
+        so copy frame.angles to keep a tick's angles
+        """
+        frame = self.frame if frame is None else frame
+        instr = self.instrumentation
+        if instr:
+            t = instr.now()
+        offsets = GAIT_PHASE_OFFSETS['trot' if gait_type == 'trot' else 'walk']
+        if instr:
+            instr.record('phase', t)
+        
+        for index, leg in enumerate(LEG_NAMES):
+            # Get foot position from trajectory
+            if instr:
+                t = instr.now()
+            x, z = self.foot_position(
+                self.step_length, self.step_height, (phase + offsets[index]) % 1.0
+            )
+            if instr:
+                instr.record('trajectory', t)
+                t = instr.now()
+            
+            # Convert to leg angles
+            foot = self.last_feet[index]
+            foot[0] = x
+            foot[1] = z + self.body_height
+            hip_angle, knee_angle = self.quadruped_ik.calculate_leg_angles(
+                leg, foot_x=foot[0], foot_z=foot[1]
+            )
+            if instr:
+                instr.record('ik', t)
+            frame.set_leg(index, hip_angle, knee_angle)
+        return frame
+    
+    def turn_frame(self, phase, direction='left', frame=None):
+        """
+        Joint angles for one frame of turning in place at the given cycle phase
+        frame: JointFrame filled in place (default: the planner's reused frame)
+        Returns: frame itself, not a copy; the default frame is overwritten on the next call,
+        so copy frame.angles to keep a tick's angles
+        """
+        frame = self.frame if frame is None else frame
+        # Adjust step trajectory for turning
+        turn_factor = 1.0 if direction == 'left' else -1.0
+        
+        instr = self.instrumentation
+        if instr:
+            t = instr.now()
+        offsets = GAIT_PHASE_OFFSETS['trot']
+        if instr:
+            instr.record('phase', t)
+        
+        for index, leg in enumerate(LEG_NAMES):
+            # Modified trajectory for turning
+            if 'left' in leg:
+                x_mod = turn_factor * 20  # Left legs move differently for turning
+            else:
+                x_mod = -turn_factor * 20
+            
+            if instr:
+                t = instr.now()
+            x, z = self.foot_position(
+                self.step_length/2, self.step_height, (phase + offsets[index]) % 1.0
+            )
+            if instr:
+                instr.record('trajectory', t)
+                t = instr.now()
+            
+            foot = self.last_feet[index]
+            foot[0] = x + x_mod
+            foot[1] = z + self.body_height
+            hip_angle, knee_angle = self.quadruped_ik.calculate_leg_angles(
+                leg, foot_x=foot[0], foot_z=foot[1]
+            )
+            if instr:
+                instr.record('ik', t)
+            frame.set_leg(index, hip_angle, knee_angle)
+        return frame
+    
+    def start_recording(self, path):
+        """Record every frame of move_forward/turn to a binary file (frame_recorder)"""
+        from frame_recorder import FrameRecorder
+        self.stop_recording()
+        self.recorder = FrameRecorder(path)
+        return self.recorder
+    
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+    
+    def record_frame(self, phase, angles, move_time, gait_table=None):
+        """Append the frame just commanded to the active recording"""
+        feet = gait_table.feet_at(phase) if gait_table is not None else self.last_feet
+        if isinstance(angles, dict):
+            joint_angles = [angles[name] for name in JOINT_NAMES]
+            positions = self.gait.command_stage.positions(joint_angles)
+        else:
+            joint_angles = angles.angle_view
+            positions = self.gait.command_stage.command_frame(angles)
+        self.recorder.record(phase, feet, joint_angles, positions, move_time)
+    
+    def move_forward(self, speed=1.0, gait_type='trot', duration=5.0, compiled=None):
         """
         Move forward with specified gait
         speed: 0.5 slow, 1.0 normal, 2.0 fast
+        compiled: interpolate from a compiled gait table (default: use_compiled_gaits)
         """
-        start_time = time.time()
+        # Any gait other than trot walks, as in forward_frame
+        gait_type = 'trot' if gait_type == 'trot' else 'walk'
         step_time = self.step_period / speed
+        compiled = self.use_compiled_gaits if compiled is None else compiled
+        gait_table = self.compile_gait(gait_type) if compiled else None
+        if self.validate_plans and not self.plan_allowed(gait_table or self.compile_gait(gait_type),
+                                                         step_time):
+            print("Plan rejected, not moving")
+            return
         
         print(f"Starting {gait_type} gait at speed {speed}")
         
-        while time.time() - start_time < duration:
-            current_time = time.time() - start_time
+        instr = self.instrumentation
+        scheduler = self.scheduler
+        scheduler.start()
+        current_time = 0.0
+        while current_time < duration:
             phase = (current_time % step_time) / step_time
             
-            if gait_type == 'trot':
-                leg_phases = self.trot_gait(phase)
+            if instr:
+                t = instr.now()
+            if gait_table is not None:
+                angles = gait_table.angles_into(phase, self.frame)
+                if instr:
+                    instr.record('table_lookup', t)
             else:
-                leg_phases = self.walk_gait(phase)
-            
-            angles = {}
-            for leg, leg_phase in leg_phases.items():
-                # Get foot position from trajectory
-                x, z = self.leg_ik.foot_trajectory(
-                    self.step_length, self.step_height, leg_phase
-                )
-                
-                # Convert to leg angles
-                hip_angle, knee_angle = self.quadruped_ik.calculate_leg_angles(
-                    leg, foot_x=x, foot_z=z + self.body_height
-                )
-                angles[f'{leg}_hip'] = hip_angle
-                angles[f'{leg}_knee'] = knee_angle
+                angles = self.forward_frame(phase, gait_type)
+            if instr:
+                instr.record('plan', t)
             
-            # Execute the movement
-            move_time = int(step_time * 500)  # Move in half step time
-            self.gait.set_multiple(angles, move_time)
-            time.sleep(step_time * 0.1)  # Small delay for smoothness
+            # Execute the movement, reaching the target by the next tick
+            self.gait.set_multiple(angles, scheduler.move_time)
+            if instr:
+                instr.frame()
+            if self.recorder is not None:
+                self.record_frame(phase, angles, scheduler.move_time, gait_table)
+            current_time = scheduler.wait()
+        
+        scheduler.report()
     
-    def turn(self, direction='left', angle=30, duration=3.0):
+    def turn(self, direction='left', angle=30, duration=3.0, compiled=None):
         """Turn in place"""
         print(f"Turning {direction}")
         
-        # Adjust step trajectory for turning
-        turn_factor = 1.0 if direction == 'left' else -1.0
-        
-        start_time = time.time()
         step_time = self.step_period
+        compiled = self.use_compiled_gaits if compiled is None else compiled
+        turn_table = self.compile_gait('trot', step_length=self.step_length/2,
+                                       x_offsets=self.turn_offsets(direction)) \
+            if compiled or self.validate_plans else None
+        gait_table = turn_table if compiled else None
+        if self.validate_plans and not self.plan_allowed(turn_table, step_time):
+            print("Plan rejected, not turning")
+            return
         
-        while time.time() - start_time < duration:
-            current_time = time.time() - start_time
+        instr = self.instrumentation
+        scheduler = self.scheduler
+        scheduler.start()
+        current_time = 0.0
+        while current_time < duration:
             phase = (current_time % step_time) / step_time
             
-            leg_phases = self.trot_gait(phase)
-            angles = {}
-            
-            for leg, leg_phase in leg_phases.items():
-                # Modified trajectory for turning
-                if 'left' in leg:
-                    x_mod = turn_factor * 20  # Left legs move differently for turning
-                else:
-                    x_mod = -turn_factor * 20
-                    
-                x, z = self.leg_ik.foot_trajectory(
-                    self.step_length/2, self.step_height, leg_phase
-                )
-                
-                hip_angle, knee_angle = self.quadruped_ik.calculate_leg_angles(
-                    leg, foot_x=x + x_mod, foot_z=z + self.body_height
-                )
-                angles[f'{leg}_hip'] = hip_angle
-                angles[f'{leg}_knee'] = knee_angle
+            if instr:
+                t = instr.now()
+            if gait_table is not None:
+                angles = gait_table.angles_into(phase, self.frame)
+                if instr:
+                    instr.record('table_lookup', t)
+            else:
+                angles = self.turn_frame(phase, direction)
+            if instr:
+                instr.record('plan', t)
             
-            self.gait.set_multiple(angles, 500)
-            time.sleep(step_time * 0.1)
+            self.gait.set_multiple(angles, scheduler.move_time)
+            if instr:
+                instr.frame()
+            if self.recorder is not None:
+                self.record_frame(phase, angles, scheduler.move_time, gait_table)
+            current_time = scheduler.wait()
+        
+        scheduler.report()
     
-    def sit(self):
-        """Sit down"""
+    def sit_angles(self):
+        """Joint angles of the sitting pose"""
         sit_angles = {}
         for leg in ['front_left', 'front_right', 'back_left', 'back_right']:
             # Sit position: hips neutral, knees bent
             sit_angles[f'{leg}_hip'] = 90
             sit_angles[f'{leg}_knee'] = 30
-        
-        self.gait.set_multiple(sit_angles, 1500)
+        return sit_angles
+    
+    def sit(self):
+        """Sit down"""
+        self.gait.set_multiple(self.sit_angles(), 1500)
         print("Sitting down")
\ No newline at end of file
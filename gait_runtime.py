@@ -0,0 +1,235 @@
+import math
+import threading
+import time
+import numpy as np
+from robot_config import WALK_CONFIG
+from inverse_kinematics import LEG_NAMES
+from control_loop import FixedRateScheduler
+from instrumentation import StageTimes
+from gait_planner import GAIT_PHASE_OFFSETS
+from joint_frame import JointFrame
+
+# +1 for left legs, -1 for right legs (LEG_NAMES order); turning left shortens left strides
+LEG_SIDE = np.array([1.0 if 'left' in leg else -1.0 for leg in LEG_NAMES])
+
+class GaitRuntime:
+    def __init__(self, planner, gait_type='trot'):
+        """
+        Continuously running gait loop steered by setpoints
+        planner: GaitPlanner providing trajectories, IK and the controller to command
+        Setpoints (speed, turn rate, gait type) may be changed from any thread and
+        take effect on the next control tick.
+        """
+        if gait_type not in GAIT_PHASE_OFFSETS:
+            raise ValueError(f"Unknown gait type {gait_type!r}")
+        self.planner = planner
+        self.scheduler = FixedRateScheduler(WALK_CONFIG['control_rate'])
+        
+        self.max_speed = 2.0      # Same scale as move_forward: 1.0 is one cycle per step_period
+        self.max_turn_rate = 1.0  # 1.0 turns in place with full opposite strides
+        self.acceleration = 2.0   # Speed/turn rate change per second
+        self.height_rate = 40.0   # Body height change, mm per second
+        self.ramp = 0.25          # Below this command, strides and step height shrink to standing
+        self.blend_cycles = 0.5   # Gait cycles over which leg phase offsets blend to a new gait
+        
+        # Setpoints (guarded by lock)
+        self.lock = threading.Lock()
+        self.target_speed = 0.0
+        self.target_turn_rate = 0.0
+        self.target_gait = gait_type
+        self.target_body_height = planner.body_height
+        self.setpoint_time = None  # When an unapplied setpoint change was made
+        
+        # Loop state (runtime thread only)
+        self.speed = 0.0
+        self.turn_rate = 0.0
+        self.phase = 0.0
+        self.gait_type = gait_type
+        self.body_height = planner.body_height
+        self.offsets = np.array(GAIT_PHASE_OFFSETS[gait_type], dtype=float)
+        self.blend_from = None
+        self.blend_progress = 0.0
+        self.frame = JointFrame()  # Reused every tick
+        
+        # Setpoint-to-command latency (seconds)
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.latencies = StageTimes()
+        
+        self.thread = None
+        self.stop_event = threading.Event()
+    
+    def set_velocity(self, speed=None, turn_rate=None):
+        """
+        Set forward speed (negative walks backward) and/or turn rate (positive turns left)
+        Values are clipped to max_speed/max_turn_rate; None leaves a setpoint unchanged.
+        """
+        for value in (speed, turn_rate):
+            if value is not None and not math.isfinite(value):
+                raise ValueError(f"Setpoint must be finite, got {value}")
+        with self.lock:
+            if speed is not None:
+                self.target_speed = max(-self.max_speed, min(self.max_speed, float(speed)))
+            if turn_rate is not None:
+                self.target_turn_rate = max(-self.max_turn_rate, min(self.max_turn_rate, float(turn_rate)))
+            self.setpoint_time = time.monotonic()
+    
+    def set_gait(self, gait_type):
+        """Switch gait at the next cycle boundary (immediately while standing)"""
+        if gait_type not in GAIT_PHASE_OFFSETS:
+            raise ValueError(f"Unknown gait type {gait_type!r}")
+        with self.lock:
+            self.target_gait = gait_type
+            self.setpoint_time = time.monotonic()
+    
+    def set_body_height(self, body_height):
+        """Raise/lower the body (hip height in mm), ramped at height_rate"""
+        if not math.isfinite(body_height):
+            raise ValueError(f"Body height must be finite, got {body_height}")
+        reach = self.planner.leg_ik.total_length
+        with self.lock:
+            self.target_body_height = max(0.0, min(reach, float(body_height)))
+            self.setpoint_time = time.monotonic()
+    
+    def stop_moving(self):
+        """Ramp down to standing; the loop keeps running"""
+        self.set_velocity(0.0, 0.0)
+    
+    def state(self):
+        """Snapshot of setpoints and the values currently being executed"""
+        with self.lock:
+            targets = (self.target_speed, self.target_turn_rate, self.target_gait,
+                       self.target_body_height)
+        return {
+            'target_speed': targets[0],
+            'target_turn_rate': targets[1],
+            'target_gait': targets[2],
+            'target_body_height': targets[3],
+            'speed': self.speed,
+            'turn_rate': self.turn_rate,
+            'gait_type': self.gait_type,
+            'body_height': self.body_height,
+            'phase': self.phase,
+            'last_latency_ms': self.last_latency * 1000,
+            'max_latency_ms': self.max_latency * 1000
+        }
+    
+    def is_standing(self):
+        return self.speed == 0.0 and self.turn_rate == 0.0
+    
+    def step(self, dt):
+        """
+        Advance the gait by dt seconds and command one frame
+        Returns: the planner's shared JointFrame, not a copy; the next tick overwrites it
+        """
+        with self.lock:
+            target_speed = self.target_speed
+            target_turn_rate = self.target_turn_rate
+            target_gait = self.target_gait
+            target_body_height = self.target_body_height
+            setpoint_time, self.setpoint_time = self.setpoint_time, None
+        
+        instr = self.planner.instrumentation
+        if instr:
+            t = instr.now()
+        
+        # Rate-limit speed, turn rate and body height towards their setpoints
+        max_change = self.acceleration * dt
+        self.speed += max(-max_change, min(max_change, target_speed - self.speed))
+        self.turn_rate += max(-max_change, min(max_change, target_turn_rate - self.turn_rate))
+        max_rise = self.height_rate * dt
+        self.body_height += max(-max_rise, min(max_rise, target_body_height - self.body_height))
+        command = abs(self.speed) + abs(self.turn_rate)
+        amplitude = min(1.0, command / self.ramp)
+        
+        # Cadence follows the command like move_forward's speed
+        advance = command * dt / self.planner.step_period
+        self.phase += advance
+        wrapped = self.phase >= 1.0
+        self.phase %= 1.0
+        
+        # Change gait only where the cycle restarts (or while standing still)
+        if target_gait != self.gait_type and (wrapped or amplitude == 0.0):
+            self.blend_from = self.offsets.copy()
+            self.blend_progress = 0.0
+            self.gait_type = target_gait
+        if self.blend_from is not None:
+            self.blend_progress = 1.0 if amplitude == 0.0 else \
+                min(1.0, self.blend_progress + advance / self.blend_cycles)
+            target = np.array(GAIT_PHASE_OFFSETS[self.gait_type], dtype=float)
+            # Shortest way round the cycle for each leg, eased in and out
+            delta = (target - self.blend_from + 0.5) % 1.0 - 0.5
+            s = self.blend_progress
+            self.offsets = self.blend_from + delta * (s * s * (3 - 2 * s))
+            if s >= 1.0:
+                self.offsets = target
+                self.blend_from = None
+        
+        # Differential strides steer; both shrink to the standing pose near zero command
+        planner = self.planner
+        leg_phases = (self.phase + self.offsets) % 1.0
+        x, z = planner.foot_positions(planner.step_length, planner.step_height, leg_phases)
+        if command > 0:
+            stride = (self.speed - LEG_SIDE * self.turn_rate) / command
+        else:
+            stride = np.zeros(len(LEG_NAMES))
+        feet_x = x * stride * amplitude
+        feet_z = z * amplitude + self.body_height
+        hip, knee, _, _ = planner.quadruped_ik.calculate_leg_angles_batch(feet_x, feet_z)
+        angles = self.frame
+        angles.angle_view[0::2] = hip
+        angles.angle_view[1::2] = knee
+        if instr:
+            instr.record('plan', t)
+        
+        move_time = self.scheduler.move_time
+        planner.gait.set_multiple(angles, move_time)
+        if setpoint_time is not None:
+            self.last_latency = time.monotonic() - setpoint_time
+            self.max_latency = max(self.max_latency, self.last_latency)
+            self.latencies.add(self.last_latency)
+        if instr:
+            instr.frame()
+        if planner.recorder is not None:
+            for foot, fx, fz in zip(planner.last_feet, feet_x.tolist(), feet_z.tolist()):
+                foot[0] = fx
+                foot[1] = fz
+            planner.record_frame(self.phase, angles, move_time)
+        return angles
+    
+    def run(self):
+        """Control loop body of the runtime thread"""
+        scheduler = self.scheduler
+        scheduler.start()
+        last_time = current_time = 0.0
+        try:
+            while not self.stop_event.is_set():
+                self.step(current_time - last_time)
+                last_time = current_time
+                current_time = scheduler.wait()
+        except Exception as e:
+            print(f"Gait runtime stopped: {e}")
+    
+    def start(self):
+        """Start the runtime thread (standing until a velocity is set)"""
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name='gait-runtime', daemon=True)
+            self.thread.start()
+        return self
+    
+    def stop(self, settle_timeout=3.0):
+        """
+        Ramp down to standing, then stop the runtime thread
+        settle_timeout: seconds to wait for the legs to come to rest (0 stops at once)
+        """
+        if self.thread is None:
+            return
+        self.stop_moving()
+        deadline = time.monotonic() + settle_timeout
+        while self.thread.is_alive() and not self.is_standing() and time.monotonic() < deadline:
+            time.sleep(self.scheduler.period)
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        self.scheduler.report()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# Headless gait parameter sweep: GaitPlanner gaits scored on a kinematic leg model
+import argparse
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from robot_config import WALK_CONFIG
+from motion_compiler import make_planner
+from motion_validator import joint_limits, validate_angles
+
+GAITS = ('trot', 'walk', 'turn')
+TRAJECTORIES = ('linear', 'bezier')
+PARAMETERS = ('step_length', 'step_height', 'body_height', 'step_period')
+COLUMNS = ('rank', 'gait', 'trajectory') + PARAMETERS + (
+    'feasible', 'speed_mm_s', 'stride_mm', 'clearance_mm', 'tracking_error_mm',
+    'ik_clamps', 'limit_clamps', 'peak_joint_speed_dps', 'speed_headroom')
+
+# Default grid (start:stop:step, inclusive)
+DEFAULT_GRID = {
+    'step_length': '20:80:10',
+    'step_height': '10:40:5',
+    'body_height': '90:140:10',
+    'step_period': '0.5:2.0:0.25'
+}
+
+# Planner of each worker process, built once by the pool initializer
+_planner = None
+
+def _init_worker():
+    global _planner
+    _planner = make_planner()
+
+def parse_values(spec):
+    """Parameter values from 'start:stop:step' (inclusive) or 'a,b,c'"""
+    if ':' in spec:
+        start, stop, step = (float(v) for v in spec.split(':'))
+        return [round(v, 6) for v in np.arange(start, stop + step / 2, step)]
+    return [float(v) for v in spec.split(',')]
+
+def evaluate(config, planner=None):
+    """
+    Run one parameter set through the planner and a kinematic model of the legs
+    config: dict with 'gait', 'trajectory' and PARAMETERS values
+    Returns: dict of the config and its scores (COLUMNS without rank)
+    """
+    planner = _planner if planner is None else planner
+    planner.step_length = config['step_length']
+    planner.step_height = config['step_height']
+    planner.body_height = config['body_height']
+    planner.step_period = config['step_period']
+    planner.trajectory_type = config['trajectory']
+    if config['gait'] == 'turn':
+        gait = planner.compile_gait('trot', step_length=planner.step_length/2,
+                                    x_offsets=planner.turn_offsets('left'))
+    else:
+        gait = planner.compile_gait(config['gait'])
+    
+    # What the legs really do: angles clamped to the joint limits, then forward kinematics
+    lower, upper = joint_limits()
+    angles = np.clip(gait.table, lower, upper)
+    limit_clamps = int(np.count_nonzero(angles != gait.table))
+    x, z = planner.leg_ik.forward_batch(angles[:, 0::2], angles[:, 1::2])
+    target_x, target_z = gait.feet[..., 0], gait.feet[..., 1]
+    
+    # Stride: ground distance each foot covers while in stance (worst leg)
+    stance = target_z >= planner.body_height - 1e-6
+    stance_x = np.where(stance, x, np.nan)
+    stride = float(np.min(np.nanmax(stance_x, axis=0) - np.nanmin(stance_x, axis=0)))
+    
+    # Clearance: highest lift of each foot above the ground line (worst leg)
+    clearance = float(np.min(np.max(planner.body_height - z, axis=0)))
+    tracking_error = float(np.max(np.hypot(x - target_x, z - target_z)))
+    
+    # Joint speed headroom at the control rate, for the clamped angles
+    step_time = planner.step_period
+    num_frames = max(2, int(round(step_time / planner.scheduler.period)))
+    report = validate_angles(np.clip(gait.sample(num_frames), lower, upper),
+                             planner.scheduler.period * 1000, cyclic=True)
+    peak = report['max_speed_dps']
+    headroom = report['allowed_speed_dps'] / peak if peak > 0 else float('inf')
+    
+    ik_clamps = int(np.count_nonzero(gait.clamped))
+    row = dict(config)
+    row.update({
+        'feasible': ik_clamps == 0 and limit_clamps == 0 and headroom >= 1.0 and clearance > 0,
+        'speed_mm_s': stride / step_time,
+        'stride_mm': stride,
+        'clearance_mm': clearance,
+        'tracking_error_mm': tracking_error,
+        'ik_clamps': ik_clamps,
+        'limit_clamps': limit_clamps,
+        'peak_joint_speed_dps': peak,
+        'speed_headroom': headroom
+    })
+    return row
+
+def sweep(configs, workers=None):
+    """Evaluate configs across a process pool; returns rows ranked best first"""
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(configs) // (workers * 16))
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+        rows = list(pool.map(evaluate, configs, chunksize=chunksize))
+    
+    # Feasible sets first, then fastest, then the most speed headroom
+    rows.sort(key=lambda r: (not r['feasible'], -r['speed_mm_s'], -r['speed_headroom']))
+    for rank, row in enumerate(rows, 1):
+        row['rank'] = rank
+    return rows
+
+def write_table(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: round(v, 3) if isinstance(v, float) else v for k, v in row.items()})
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep gait parameters on a kinematic leg model")
+    for name in PARAMETERS:
+        parser.add_argument(f"--{name.replace('_', '-')}", default=DEFAULT_GRID[name],
+                            help=f"Values as start:stop:step or a,b,c (default {DEFAULT_GRID[name]})")
+    parser.add_argument('--gaits', default=','.join(GAITS), help="Gaits to sweep")
+    parser.add_argument('--trajectories', default=','.join(TRAJECTORIES), help="Trajectory types")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--output', default='gait_sweep.csv', help="Ranked CSV output path")
+    parser.add_argument('--top', type=int, default=10, help="Rows to print")
+    args = parser.parse_args()
+    
+    grid = {name: parse_values(getattr(args, name)) for name in PARAMETERS}
+    gaits = args.gaits.split(',')
+    trajectories = args.trajectories.split(',')
+    configs = [
+        dict(zip(('gait', 'trajectory') + PARAMETERS, values))
+        for values in itertools.product(gaits, trajectories, *(grid[name] for name in PARAMETERS))
+    ]
+    
+    print(f"Sweeping {len(configs)} configurations "
+          f"(current: {', '.join(f'{k}={WALK_CONFIG[k]}' for k in PARAMETERS[:3])})")
+    start = time.perf_counter()
+    rows = sweep(configs, args.workers)
+    elapsed = time.perf_counter() - start
+    write_table(rows, args.output)
+    
+    feasible = sum(row['feasible'] for row in rows)
+    print(f"Done in {elapsed:.1f} s ({len(configs) / elapsed:.0f} configs/s), "
+          f"{feasible} feasible, results in {args.output}")
+    for row in rows[:args.top]:
+        print(f"  #{row['rank']:<4d} {row['gait']:5s} {row['trajectory']:6s} "
+              f"length {row['step_length']:g} height {row['step_height']:g} "
+              f"body {row['body_height']:g} period {row['step_period']:g}: "
+              f"{row['speed_mm_s']:.0f} mm/s, clearance {row['clearance_mm']:.0f} mm, "
+              f"headroom {row['speed_headroom']:.2f}{'' if row['feasible'] else ' (infeasible)'}")
+
+if __name__ == "__main__":
+    main()
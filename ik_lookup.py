@@ -0,0 +1,223 @@
+import os
+from array import array
+import numpy as np
+from robot_config import ANGLE_LIMITS, IK_TABLE_FILE
+
+VERSION = 1
+
+# Safety factor on the error measured between grid points, for the points not sampled
+ERROR_MARGIN = 1.5
+
+def ik_table_path(path=None):
+    """Lookup table file path; the default is relative to this directory"""
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), IK_TABLE_FILE)
+    return path
+
+class IKLookupTable:
+    def __init__(self, thigh_length, shin_length, x_min, z_min, resolution,
+                 hip, knee, reachable, error):
+        """
+        Hip/knee angles of one leg sampled on a regular (x, z) grid
+        hip, knee: (nz, nx) angles in degrees at x = x_min + j * resolution,
+                   z = z_min + i * resolution (LegIK conventions, z positive down)
+        reachable: (nz, nx) mask of grid points the leg reaches without scaling
+        error: (nz-1, nx-1) interpolation error bound of each cell (degrees),
+               inf for cells touching unreachable points
+        """
+        self.thigh = float(thigh_length)
+        self.shin = float(shin_length)
+        self.x_min = float(x_min)
+        self.z_min = float(z_min)
+        self.resolution = float(resolution)
+        self.hip = hip
+        self.knee = knee
+        self.reachable = reachable
+        self.error = error
+        self.nz, self.nx = hip.shape
+        self.x_max = self.x_min + (self.nx - 1) * self.resolution
+        self.z_max = self.z_min + (self.nz - 1) * self.resolution
+        
+        # Joint limit mask from ANGLE_LIMITS (uncalibrated joint angles)
+        hip_min, hip_max = ANGLE_LIMITS['hip']
+        knee_min, knee_max = ANGLE_LIMITS['knee']
+        self.within_limits = reachable & (hip >= hip_min) & (hip <= hip_max) & \
+            (knee >= knee_min) & (knee <= knee_max)
+        
+        # Cells answered by interpolation, and cells whose corners all respect the limits
+        self.cell_valid = np.isfinite(error)
+        self.cell_feasible = self.cell_valid & self._all_corners(self.within_limits)
+        self.max_error = float(error[self.cell_valid].max()) if self.cell_valid.any() else 0.0
+        
+        self._flat = None
+    
+    @staticmethod
+    def _all_corners(mask):
+        """(nz-1, nx-1) mask of cells whose four corner points are all set"""
+        return mask[:-1, :-1] & mask[:-1, 1:] & mask[1:, :-1] & mask[1:, 1:]
+    
+    @classmethod
+    def build(cls, leg_ik, resolution=1.0, x_range=None, z_range=None, tolerance=0.05):
+        """
+        Sample the workspace of a LegIK with its exact solver
+        resolution: grid spacing (mm); the interpolation error shrinks with its square
+        x_range, z_range: (min, max) in mm; default covers the full reach below the hip
+        tolerance: cells with a larger error bound (degrees) are left to the exact
+                   solver; these are the cells near full extension, where the angles
+                   change fastest
+        """
+        reach = leg_ik.total_length
+        x_min, x_max = (-reach, reach) if x_range is None else x_range
+        z_min, z_max = (0.0, reach) if z_range is None else z_range
+        nx = int(round((x_max - x_min) / resolution)) + 1
+        nz = int(round((z_max - z_min) / resolution)) + 1
+        
+        # Solve on a grid twice as fine: even points form the table, the points in
+        # between (edge midpoints and cell centres) measure its interpolation error
+        xs = x_min + np.arange(2 * nx - 1) * (resolution / 2)
+        zs = z_min + np.arange(2 * nz - 1) * (resolution / 2)
+        hip_fine, knee_fine, scaled, too_close = leg_ik.solve_angles_batch(xs[None, :], zs[:, None])
+        reachable_fine = ~(scaled | too_close)
+        
+        hip = hip_fine[::2, ::2].astype(np.float32)
+        knee = knee_fine[::2, ::2].astype(np.float32)
+        reachable = reachable_fine[::2, ::2]
+        table = cls(leg_ik.thigh, leg_ik.shin, x_min, z_min, resolution, hip, knee,
+                    reachable, np.zeros((nz - 1, nx - 1), dtype=np.float32))
+        
+        hip_interp, knee_interp, _ = table.interpolate(xs[None, :], zs[:, None])
+        fine_error = np.maximum(np.abs(hip_interp - hip_fine), np.abs(knee_interp - knee_fine))
+        fine_error[~reachable_fine] = np.inf
+        
+        # Each cell's bound is the worst of the 3 x 3 fine points it spans
+        error = np.maximum.reduce([
+            fine_error[a:a + 2 * (nz - 1):2, b:b + 2 * (nx - 1):2]
+            for a in range(3) for b in range(3)
+        ]) * ERROR_MARGIN
+        error[error > tolerance] = np.inf
+        error = error.astype(np.float32)
+        return cls(leg_ik.thigh, leg_ik.shin, x_min, z_min, resolution, hip, knee, reachable, error)
+    
+    def save(self, path=None):
+        """Write the table to an .npz file"""
+        path = ik_table_path(path)
+        np.savez(path, version=VERSION, thigh=self.thigh, shin=self.shin,
+                 x_min=self.x_min, z_min=self.z_min, resolution=self.resolution,
+                 hip=self.hip, knee=self.knee, reachable=self.reachable, error=self.error)
+        return path
+    
+    @classmethod
+    def load(cls, path=None, leg_ik=None):
+        """
+        Read a table written by save
+        leg_ik: if given, the table must have been built for its leg lengths
+        """
+        with np.load(ik_table_path(path)) as data:
+            if int(data['version']) != VERSION:
+                raise ValueError(f"IK table version {int(data['version'])}, expected {VERSION}")
+            thigh, shin = float(data['thigh']), float(data['shin'])
+            if leg_ik is not None and (thigh, shin) != (float(leg_ik.thigh), float(leg_ik.shin)):
+                raise ValueError(f"IK table is for legs {thigh}/{shin} mm, "
+                                 f"not {leg_ik.thigh}/{leg_ik.shin} mm")
+            return cls(thigh, shin, float(data['x_min']), float(data['z_min']),
+                       float(data['resolution']), data['hip'], data['knee'],
+                       data['reachable'], data['error'])
+    
+    @classmethod
+    def for_leg(cls, leg_ik, path=None, resolution=1.0):
+        """Load the table for leg_ik, building and saving it if missing or stale"""
+        try:
+            table = cls.load(path, leg_ik)
+            if table.resolution == resolution:
+                return table
+        except (OSError, ValueError, KeyError):
+            pass
+        table = cls.build(leg_ik, resolution)
+        saved = table.save(path)
+        print(f"Built IK lookup table {table.nx}x{table.nz} at {resolution} mm "
+              f"(max error {table.max_error:.4f} deg) in {saved}")
+        return table
+    
+    def _cells(self, x, z):
+        """
+        Grid cells of arrays of points
+        Returns: (corner, cell, tz, tx, inside) - flat indices of each cell's first
+        grid point and of the cell, fractional offsets, and the in-grid mask
+        """
+        scale = 1.0 / self.resolution
+        fx = (np.asarray(x, dtype=float) - self.x_min) * scale
+        fz = (np.asarray(z, dtype=float) - self.z_min) * scale
+        fx, fz = np.broadcast_arrays(fx, fz)
+        inside = (fx >= 0) & (fx <= self.nx - 1) & (fz >= 0) & (fz <= self.nz - 1)
+        j = np.clip(fx.astype(int), 0, self.nx - 2)
+        i = np.clip(fz.astype(int), 0, self.nz - 2)
+        return i * self.nx + j, i * (self.nx - 1) + j, fz - i, fx - j, inside
+    
+    def _bilinear(self, grid, k, tz, tx):
+        flat = grid.reshape(-1)
+        n = self.nx
+        top = flat[k] + (flat[k + 1] - flat[k]) * tx
+        bottom = flat[k + n] + (flat[k + n + 1] - flat[k + n]) * tx
+        return top + (bottom - top) * tz
+    
+    def interpolate(self, x, z):
+        """
+        Bilinear hip/knee angles for arrays of foot positions
+        Returns: (hip_angles, knee_angles, valid) where valid marks points inside the
+        grid whose cell is fully reachable, i.e. within the cell's error bound
+        (angles of points that are not valid are meaningless)
+        """
+        corner, cell, tz, tx, inside = self._cells(x, z)
+        hip = self._bilinear(self.hip, corner, tz, tx)
+        knee = self._bilinear(self.knee, corner, tz, tx)
+        return hip, knee, inside & self.cell_valid.reshape(-1)[cell]
+    
+    def error_at(self, x, z):
+        """Interpolation error bound (degrees) for arrays of points; inf where not valid"""
+        _, cell, _, _, inside = self._cells(x, z)
+        return np.where(inside, self.error.reshape(-1)[cell], np.inf)
+    
+    def feasible(self, x, z):
+        """
+        Foothold check for arrays of points: reachable and within ANGLE_LIMITS
+        Conservative: the whole grid cell around the point must pass.
+        """
+        _, cell, _, _, inside = self._cells(x, z)
+        return inside & self.cell_feasible.reshape(-1)[cell]
+    
+    def angles(self, x, z):
+        """
+        Scalar lookup without NumPy calls, for the per-joint control path
+        Returns: (hip_angle, knee_angle), or None outside the grid or a valid cell
+        """
+        flat = self._flat
+        if flat is None:
+            flat = self._flat = (self.x_min, self.z_min, 1.0 / self.resolution, self.nx, self.nz,
+                                 array('d', self.hip.ravel().tolist()),
+                                 array('d', self.knee.ravel().tolist()),
+                                 array('b', self.cell_valid.ravel().tolist()))
+        x_min, z_min, scale, nx, nz, hip, knee, valid = flat
+        
+        fx = (x - x_min) * scale
+        fz = (z - z_min) * scale
+        if fx < 0 or fz < 0 or fx > nx - 1 or fz > nz - 1:
+            return None
+        j = int(fx)
+        i = int(fz)
+        if j == nx - 1:
+            j -= 1
+        if i == nz - 1:
+            i -= 1
+        if not valid[i * (nx - 1) + j]:
+            return None
+        
+        tx = fx - j
+        tz = fz - i
+        k = i * nx + j
+        h00, h01, h10, h11 = hip[k], hip[k + 1], hip[k + nx], hip[k + nx + 1]
+        k00, k01, k10, k11 = knee[k], knee[k + 1], knee[k + nx], knee[k + nx + 1]
+        top = h00 + (h01 - h00) * tx
+        hip_angle = top + (h10 + (h11 - h10) * tx - top) * tz
+        top = k00 + (k01 - k00) * tx
+        knee_angle = top + (k10 + (k11 - k10) * tx - top) * tz
+        return hip_angle, knee_angle
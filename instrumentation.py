@@ -0,0 +1,79 @@
+import time
+from array import array
+
+class StageTimes:
+    def __init__(self, size=1024):
+        """Fixed-size ring buffer of the most recent durations (seconds) of one stage"""
+        self.size = size
+        self.samples = array('d', bytes(8 * size))
+        self.index = 0
+        self.count = 0
+        self.max = 0.0
+    
+    def add(self, duration):
+        self.samples[self.index] = duration
+        self.index = (self.index + 1) % self.size
+        self.count += 1
+        if duration > self.max:
+            self.max = duration
+    
+    def percentile(self, q):
+        """q-th percentile (0-100) of the buffered samples"""
+        n = min(self.count, self.size)
+        if n == 0:
+            return 0.0
+        ordered = sorted(self.samples[:n])
+        return ordered[min(n - 1, int(q / 100.0 * n))]
+
+class Instrumentation:
+    now = staticmethod(time.perf_counter)
+    
+    def __init__(self, size=1024):
+        """
+        Per-stage latency recorder for the control path
+        Components hold an `instrumentation` attribute that is None when disabled,
+        so the only cost then is a falsy check per stage.
+        """
+        self.size = size
+        self.stages = {}
+        self.frame_marks = StageTimes(size)
+        self.last_frame = None
+    
+    def record(self, stage, start):
+        """Record the time since start (from now()) for stage"""
+        duration = time.perf_counter() - start
+        times = self.stages.get(stage)
+        if times is None:
+            times = self.stages[stage] = StageTimes(self.size)
+        times.add(duration)
+    
+    def frame(self):
+        """Mark a control frame boundary (for frame rate)"""
+        t = time.perf_counter()
+        if self.last_frame is not None:
+            self.frame_marks.add(t - self.last_frame)
+        self.last_frame = t
+    
+    def stats(self):
+        """p50/p99/max per stage (microseconds) and frame rate"""
+        stages = {}
+        for stage, times in self.stages.items():
+            stages[stage] = {
+                'count': times.count,
+                'p50_us': times.percentile(50) * 1e6,
+                'p99_us': times.percentile(99) * 1e6,
+                'max_us': times.max * 1e6
+            }
+        period = self.frame_marks.percentile(50)
+        return {
+            'stages': stages,
+            'frame_rate_hz': 1.0 / period if period > 0 else 0.0
+        }
+    
+    def report(self):
+        """Print per-stage latency statistics"""
+        s = self.stats()
+        print(f"Control path timing (frame rate {s['frame_rate_hz']:.1f} Hz):")
+        for stage, t in s['stages'].items():
+            print(f"  {stage:18s} n={t['count']:<8d} p50 {t['p50_us']:9.1f} us  "
+                  f"p99 {t['p99_us']:9.1f} us  max {t['max_us']:9.1f} us")
@@ -1,6 +1,16 @@
 import math
 import numpy as np
 
+# Leg order used by all batch (array) APIs
+LEG_NAMES = ('front_left', 'front_right', 'back_left', 'back_right')
+
+# Joint order used by joint-angle arrays (matches SERVO_MAP)
+JOINT_NAMES = [f'{leg}_{joint}' for leg in LEG_NAMES for joint in ('hip', 'knee')]
+
+# Sign of body pitch/roll added to each leg's hip angle, in LEG_NAMES order
+LEG_PITCH_SIGN = np.array([1.0 if 'front' in leg else -1.0 for leg in LEG_NAMES])
+LEG_ROLL_SIGN = np.array([1.0 if 'left' in leg else -1.0 for leg in LEG_NAMES])
+
 class LegIK:
     def __init__(self, thigh_length=80, shin_length=80):
         """
@@ -11,6 +21,19 @@ class LegIK:
         self.thigh = thigh_length
         self.shin = shin_length
         self.total_length = thigh_length + shin_length
+        
+        # Precomputed workspace grid (ik_lookup.IKLookupTable), None to always solve
+        self.lookup = None
+    
+    def use_lookup(self, table=None, path=None, resolution=1.0):
+        """
+        Answer IK by interpolating a precomputed workspace grid
+        table: prebuilt IKLookupTable; default loads path (building it if missing or stale)
+        Targets outside the table's valid cells fall back to the exact solution.
+        """
+        from ik_lookup import IKLookupTable
+        self.lookup = table if table is not None else IKLookupTable.for_leg(self, path, resolution)
+        return self.lookup
     
     def calculate_angles(self, x, z):
         """
@@ -20,6 +43,11 @@ class LegIK:
         
         Returns: (hip_angle, knee_angle) in degrees
         """
+        if self.lookup is not None:
+            angles = self.lookup.angles(x, z)
+            if angles is not None:
+                return angles
+        
         # Ensure the point is reachable
         distance = math.sqrt(x**2 + z**2)
         if distance > self.total_length:
@@ -48,6 +76,76 @@ class LegIK:
         
         return hip_angle_deg, knee_angle_deg
     
+    def calculate_angles_batch(self, x, z):
+        """
+        Vectorized version of calculate_angles for arrays of foot positions
+        x, z: array-like foot positions (mm), broadcast against each other
+        
+        Returns: (hip_angles, knee_angles, scaled, too_close)
+        hip_angles, knee_angles: arrays in degrees
+        scaled: mask of targets beyond reach that were scaled to maximum reach
+        too_close: mask of targets too close to the hip, returned as (0, 0)
+        """
+        if self.lookup is None:
+            return self.solve_angles_batch(x, z)
+        
+        hip_angle, knee_angle, valid = self.lookup.interpolate(x, z)
+        # Writable arrays at the broadcast shape (interpolation of 0-d input gives scalars)
+        shape = np.shape(valid)
+        hip_angle = np.array(np.broadcast_to(hip_angle, shape), dtype=float)
+        knee_angle = np.array(np.broadcast_to(knee_angle, shape), dtype=float)
+        scaled = np.zeros(hip_angle.shape, dtype=bool)
+        too_close = np.zeros(hip_angle.shape, dtype=bool)
+        if not valid.all():
+            # Solve the targets the table cannot answer
+            x, z = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(z, dtype=float))
+            missing = ~valid
+            hip_angle[missing], knee_angle[missing], scaled[missing], too_close[missing] = \
+                self.solve_angles_batch(x[missing], z[missing])
+        return hip_angle, knee_angle, scaled, too_close
+    
+    def solve_angles_batch(self, x, z):
+        """Exact law-of-cosines solution behind calculate_angles_batch (same returns)"""
+        x, z = np.broadcast_arrays(np.asarray(x, dtype=float),
+                                   np.asarray(z, dtype=float))
+        distance = np.hypot(x, z)
+        
+        # Scale unreachable targets to maximum reach
+        scaled = distance > self.total_length
+        scale = np.where(scaled, self.total_length / np.where(scaled, distance, 1.0), 1.0)
+        x = x * scale
+        z = z * scale
+        distance = np.where(scaled, self.total_length, distance)
+        
+        too_close = (distance < abs(self.thigh - self.shin)) | (distance == 0)
+        safe_distance = np.where(too_close, self.total_length, distance)
+        
+        # Knee angle using law of cosines
+        cos_knee = (self.thigh**2 + self.shin**2 - safe_distance**2) / (2 * self.thigh * self.shin)
+        knee_angle = np.degrees(np.arccos(np.clip(cos_knee, -1, 1)))
+        
+        # Hip angle
+        alpha = np.arctan2(z, x)
+        cos_beta = (self.thigh**2 + safe_distance**2 - self.shin**2) / (2 * self.thigh * safe_distance)
+        hip_angle = np.degrees(alpha + np.arccos(np.clip(cos_beta, -1, 1)))
+        
+        hip_angle = np.where(too_close, 0.0, hip_angle)
+        knee_angle = np.where(too_close, 0.0, knee_angle)
+        
+        return hip_angle, knee_angle, scaled, too_close
+    
+    def forward_batch(self, hip_angle, knee_angle):
+        """
+        Foot positions reached by hip/knee angles (degrees), the inverse of
+        calculate_angles_batch: the knee angle is the inner angle between thigh and shin
+        Returns: (x, z) arrays in mm
+        """
+        hip = np.radians(hip_angle)
+        shin = hip + np.radians(knee_angle) - np.pi
+        x = self.thigh * np.cos(hip) + self.shin * np.cos(shin)
+        z = self.thigh * np.sin(hip) + self.shin * np.sin(shin)
+        return x, z
+    
     def foot_trajectory(self, step_length=40, step_height=20, phase=0):
         """
         Generate foot trajectory for walking
@@ -64,12 +162,49 @@ class LegIK:
             z = 0  # On ground
         
         return x, z
+    
+    def foot_trajectory_batch(self, step_length=40, step_height=20, phase=0):
+        """
+        Vectorized version of foot_trajectory for an array of phases
+        Returns: (x, z) arrays with the shape of phase
+        """
+        phase = np.asarray(phase, dtype=float)
+        swing = phase < 0.5
+        x = np.where(swing,
+                     -step_length/2 + step_length * phase * 2,
+                     step_length/2 - step_length * (phase - 0.5) * 2)
+        z = np.where(swing, -step_height * np.sin(phase * np.pi), 0.0)
+        return x, z
+
+def rotation_matrix(roll=0, pitch=0, yaw=0):
+    """
+    Body rotation matrices R = Rz(yaw) Ry(pitch) Rx(roll), angles in degrees
+    Angles may be arrays; returns shape (..., 3, 3)
+    """
+    roll, pitch, yaw = np.broadcast_arrays(*(np.radians(a) for a in (roll, pitch, yaw)))
+    cr, sr = np.cos(roll), np.sin(roll)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    return np.stack([
+        np.stack([cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr], axis=-1),
+        np.stack([sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr], axis=-1),
+        np.stack([-sp, cp * sr, cp * cr], axis=-1)
+    ], axis=-2)
 
 class QuadrupedIK:
     def __init__(self, leg_ik, body_width=100, body_length=120):
         self.leg_ik = leg_ik
         self.body_width = body_width
         self.body_length = body_length
+        
+        # Hip positions relative to the body center, LEG_NAMES order
+        # Frame: x forward, y right, z down
+        self.hip_offsets = np.array([
+            [body_length/2 if 'front' in leg else -body_length/2,
+             -body_width/2 if 'left' in leg else body_width/2,
+             0.0]
+            for leg in LEG_NAMES
+        ])
     
     def calculate_leg_angles(self, leg_position, foot_x=0, foot_z=120, body_roll=0, body_pitch=0):
         """
@@ -94,10 +229,58 @@ class QuadrupedIK:
             hip_angle += body_pitch
         else:
             hip_angle -= body_pitch
-            
+        
         if 'left' in leg_position:
             hip_angle += body_roll
         else:
             hip_angle -= body_roll
         
-        return hip_angle, knee_angle
\ No newline at end of file
+        return hip_angle, knee_angle
+    
+    def calculate_leg_angles_batch(self, foot_x, foot_z, body_roll=0, body_pitch=0):
+        """
+        Calculate angles for all four legs (or whole trajectories) in one call
+        foot_x, foot_z: arrays whose last axis is ordered as LEG_NAMES
+        body_roll, body_pitch: body orientation in degrees
+        
+        Returns: (hip_angles, knee_angles, scaled, too_close), see LegIK.calculate_angles_batch
+        """
+        hip_angle, knee_angle, scaled, too_close = self.leg_ik.calculate_angles_batch(foot_x, foot_z)
+        hip_angle = hip_angle + LEG_PITCH_SIGN * body_pitch + LEG_ROLL_SIGN * body_roll
+        return hip_angle, knee_angle, scaled, too_close
+    
+    def default_feet(self):
+        """Foot positions (4, 3) on the ground directly below each hip"""
+        feet = self.hip_offsets.copy()
+        feet[:, 2] = 0.0
+        return feet
+    
+    def solve_body_pose(self, feet, body_height=120, roll=0, pitch=0, yaw=0):
+        """
+        Joint angles for all four legs given the body pose and foot positions
+        feet: (..., 4, 3) foot positions in LEG_NAMES order, in the ground frame
+              below the body center (x forward, y right, z down, ground at z=0)
+        body_height: height of the hips above the ground (mm)
+        roll, pitch, yaw: body orientation in degrees (right-handed about x, y, z)
+        Leading dimensions of feet and the pose values broadcast, so whole
+        trajectories solve in one call.
+        
+        Each foot is moved into its hip frame; the legs are planar (no abduction),
+        so the lateral (y) component is ignored.
+        
+        Returns: (hip_angles, knee_angles, scaled, too_close) with shape (..., 4)
+        """
+        feet = np.asarray(feet, dtype=float)
+        body_height = np.asarray(body_height, dtype=float)
+        
+        # Feet repeated for every pose, then relative to the body center and
+        # rotated into the body frame (R^T v)
+        pose_shape = np.broadcast_shapes(body_height.shape, np.shape(roll), np.shape(pitch),
+                                         np.shape(yaw))
+        relative = np.broadcast_to(feet, np.broadcast_shapes(feet.shape, pose_shape + (1, 1))).copy()
+        relative[..., 2] += body_height[..., None]
+        rotation = rotation_matrix(roll, pitch, yaw)
+        in_body = np.einsum('...ji,...lj->...li', rotation, relative)
+        in_hip = in_body - self.hip_offsets
+        
+        return self.leg_ik.calculate_angles_batch(in_hip[..., 0], in_hip[..., 2])
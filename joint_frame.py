@@ -0,0 +1,56 @@
+from array import array
+import numpy as np
+from robot_config import SERVO_MAP
+from inverse_kinematics import JOINT_NAMES
+
+# Position of each joint in a frame (JOINT_NAMES order)
+JOINT_INDEX = {name: i for i, name in enumerate(JOINT_NAMES)}
+
+# Servo ID of each frame slot
+FRAME_SERVO_IDS = array('B', [SERVO_MAP[name] for name in JOINT_NAMES])
+
+class JointFrame:
+    __slots__ = ('angles', 'positions', 'servo_ids', 'send_ids', 'send_positions', 'count',
+                 'angle_view', 'position_view')
+    
+    def __init__(self, angles=None):
+        """
+        Preallocated joint frame, filled in place on every control tick
+        angles: joint angles (degrees) in JOINT_NAMES order
+        positions: servo positions (0-1000), see ServoCommandStage.command_frame
+        send_ids/send_positions: the first count servos the controller sends this tick
+        angle_view/position_view: NumPy arrays sharing the angles/positions buffers
+        A frame is reused, so its values are only valid until the next tick.
+        """
+        size = len(JOINT_NAMES)
+        self.angles = array('d', bytes(8 * size)) if angles is None else array('d', angles)
+        self.positions = array('i', [0] * size)
+        self.servo_ids = FRAME_SERVO_IDS
+        self.send_ids = array('B', FRAME_SERVO_IDS)
+        self.send_positions = array('i', [0] * size)
+        self.count = 0
+        self.angle_view = np.frombuffer(self.angles, dtype=float)
+        self.position_view = np.frombuffer(self.positions, dtype=np.intc)
+    
+    def set_leg(self, leg_index, hip_angle, knee_angle):
+        """Set one leg's joints (leg_index in LEG_NAMES order)"""
+        angles = self.angles
+        angles[2 * leg_index] = hip_angle
+        angles[2 * leg_index + 1] = knee_angle
+    
+    def update(self, servo_angles):
+        """Set joints from a dict keyed by servo name; other joints keep their angles"""
+        angles = self.angles
+        for name, angle in servo_angles.items():
+            angles[JOINT_INDEX[name]] = angle
+        return self
+    
+    def as_dict(self):
+        """Joint angles keyed by servo name (compatibility with dict-based callers)"""
+        return dict(zip(JOINT_NAMES, self.angles))
+    
+    def __getitem__(self, name):
+        return self.angles[JOINT_INDEX[name]]
+    
+    def __len__(self):
+        return len(self.angles)
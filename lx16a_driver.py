@@ -1,33 +1,358 @@
 import serial
+import glob
 import time
 import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from robot_config import SERVO_MAP, BUS_PORTS, SERVO_BUS
+
+# LX-16A protocol
+PACKET_HEADER = 0x55
+SERVO_MOVE_TIME_WRITE = 0x03
+SERVO_MOVE_TIME_WAIT_WRITE = 0x07
+SERVO_MOVE_START = 0x0B
+SERVO_ID_READ = 0x0E
+SERVO_TORQUE_OFF = 0x14
+SERVO_TEMP_READ = 0x1A
+SERVO_VIN_READ = 0x1B
+SERVO_POS_READ = 0x1C
+BROADCAST_ID = 0xFE
+
+# Parameter format of each read command's response
+READ_FORMATS = {
+    SERVO_ID_READ: '<B',     # servo ID
+    SERVO_TEMP_READ: '<B',   # degrees C
+    SERVO_VIN_READ: '<H',    # millivolts
+    SERVO_POS_READ: '<h'     # position, 0-1000 (may go slightly negative)
+}
+
+# Bits on the wire per byte (start + 8 data + stop)
+BITS_PER_BYTE = 10
+
+# Serial read poll interval and reply timing (seconds)
+READ_POLL_TIMEOUT = 0.005
+RESPONSE_GAP = 0.0005      # Bus turnaround before a servo replies
+RESPONSE_TIMEOUT = 0.05    # Extra wait for replies after their scheduled time
+READY_TIMEOUT = 2.0        # Longest wait for the bus to answer after opening a port
+PING_TIMEOUT = 0.05        # Wait for replies to one round of pings
+
+# Port name that selects the emulated bus (lx16a_emulator) instead of a serial device
+EMULATOR_PORT = 'emulator'
+
+def checksum(packet, start, end):
+    """LX-16A checksum of packet[start:end] (ID, length, command and parameters)"""
+    return ~sum(packet[start:end]) & 0xFF
+
+def build_packet(servo_id, command, data=()):
+    """Build a complete LX-16A packet"""
+    packet = bytearray([PACKET_HEADER, PACKET_HEADER, servo_id, len(data) + 3, command])
+    packet.extend(data)
+    packet.append(checksum(packet, 2, len(packet)))
+    return bytes(packet)
+
+class PacketParser:
+    MAX_LENGTH = 32
+    
+    def __init__(self):
+        """Streaming LX-16A packet parser tolerant of partial packets and garbage bytes"""
+        self.buffer = bytearray()
+        self.discarded_bytes = 0
+        self.bad_checksums = 0
+    
+    def reset(self):
+        """Drop any buffered bytes"""
+        self.buffer.clear()
+    
+    def feed(self, data):
+        """
+        Add received bytes and return the complete packets found
+        Returns: list of (servo_id, command, params) with params as bytes
+        """
+        buf = self.buffer
+        buf.extend(data)
+        packets = []
+        
+        while True:
+            start = buf.find(b'\x55\x55')
+            if start < 0:
+                # Keep a trailing 0x55 that may start the next header
+                keep = 1 if buf[-1:] == b'\x55' else 0
+                self.discarded_bytes += len(buf) - keep
+                del buf[:len(buf) - keep]
+                break
+            if start:
+                self.discarded_bytes += start
+                del buf[:start]
+            if len(buf) < 4:
+                break
+            
+            length = buf[3]
+            if length < 3 or length > self.MAX_LENGTH:
+                # Not a real header, resync on the next byte
+                self.discarded_bytes += 1
+                del buf[:1]
+                continue
+            size = length + 3
+            if len(buf) < size:
+                break
+            
+            if buf[size - 1] != checksum(buf, 2, size - 1):
+                self.bad_checksums += 1
+                self.discarded_bytes += 1
+                del buf[:1]
+                continue
+            
+            packets.append((buf[2], buf[4], bytes(buf[5:size - 1])))
+            del buf[:size]
+        
+        return packets
+
+class FrameEncoder:
+    MOVE_PACKET_SIZE = 10
+    
+    def __init__(self, max_servos=8, command=SERVO_MOVE_TIME_WRITE, trailer=b''):
+        """
+        Encodes one move packet per servo into a single preallocated buffer
+        max_servos: number of packet slots (grows on demand)
+        trailer: constant packet(s) sent after the servo packets in the same write
+        """
+        self.command = command
+        self.trailer = trailer
+        self._allocate(max_servos)
+    
+    def _allocate(self, max_servos):
+        """Preallocate the buffer with the constant header bytes of each slot"""
+        self.max_servos = max_servos
+        self.buffer = bytearray(self.MOVE_PACKET_SIZE * max_servos + len(self.trailer))
+        for offset in range(0, self.MOVE_PACKET_SIZE * max_servos, self.MOVE_PACKET_SIZE):
+            self.buffer[offset:offset + 5] = bytes([PACKET_HEADER, PACKET_HEADER, 0, 7, self.command])
+        self.view = memoryview(self.buffer)
+    
+    def encode(self, servo_ids, positions, move_time, count=None):
+        """
+        Encode a move packet for every servo in place
+        count: encode only the first count servos (default: all)
+        Returns: memoryview over the encoded bytes, valid until the next encode
+        """
+        count = len(servo_ids) if count is None else count
+        if count > self.max_servos:
+            self._allocate(count)
+        
+        buf = self.buffer
+        time_low = move_time & 0xFF
+        time_high = (move_time >> 8) & 0xFF
+        offset = 0
+        for i in range(count):
+            servo_id = servo_ids[i]
+            position = max(0, min(1000, positions[i]))
+            buf[offset + 2] = servo_id
+            buf[offset + 5] = time_low
+            buf[offset + 6] = time_high
+            buf[offset + 7] = position & 0xFF
+            buf[offset + 8] = (position >> 8) & 0xFF
+            buf[offset + 9] = checksum(buf, offset + 2, offset + 9)
+            offset += self.MOVE_PACKET_SIZE
+        if self.trailer:
+            buf[offset:offset + len(self.trailer)] = self.trailer
+            offset += len(self.trailer)
+        return self.view[:offset]
+
+class FrameWriter:
+    def __init__(self, driver):
+        """
+        Background serial writer with a one-slot, latest-wins frame mailbox
+        The planner publishes frames without blocking; the writer thread always
+        sends the freshest commands. A frame it did not get to is superseded by
+        merging the next one into it per servo, so no servo's command is lost
+        (delta-suppressed frames only carry the servos that changed).
+        """
+        self.driver = driver
+        self._cond = threading.Condition()
+        self._pending = None
+        self._running = False
+        self._thread = None
+        
+        self.frames_published = 0
+        self.frames_written = 0
+        self.frames_superseded = 0
+        self.last_write_latency = 0.0
+        self.max_write_latency = 0.0
+        self.total_write_latency = 0.0
+    
+    def start(self):
+        """Start the writer thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='lx16a-writer', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Send any pending frame, then stop the writer thread"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def publish(self, servo_ids, positions, move_time, synchronized=False, count=None):
+        """
+        Merge a frame into the pending one, newest command per servo (never blocks on I/O)
+        The IDs and positions are copied, so the caller may reuse its buffers.
+        """
+        count = len(servo_ids) if count is None else count
+        with self._cond:
+            pending = self._pending
+            if pending is None:
+                # servo_id -> position, move time, synchronized, publish time of the oldest command
+                pending = self._pending = [{}, move_time, synchronized, time.monotonic()]
+            else:
+                self.frames_superseded += 1
+                pending[1] = move_time
+                pending[2] = synchronized
+            commands = pending[0]
+            for i in range(count):
+                commands[servo_ids[i]] = positions[i]
+            self.frames_published += 1
+            self._cond.notify()
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and self._running:
+                    self._cond.wait()
+                frame = self._pending
+                self._pending = None
+                if frame is None:
+                    return
+            
+            commands, move_time, synchronized, published = frame
+            self.driver.send_frame(list(commands), list(commands.values()), move_time, synchronized)
+            
+            latency = time.monotonic() - published
+            self.frames_written += 1
+            self.last_write_latency = latency
+            self.total_write_latency += latency
+            self.max_write_latency = max(self.max_write_latency, latency)
+    
+    def stats(self):
+        """Mailbox counters and publish-to-written latency"""
+        written = self.frames_written
+        return {
+            'frames_published': self.frames_published,
+            'frames_written': written,
+            'frames_superseded': self.frames_superseded,
+            'write_latency_avg_ms': self.total_write_latency / written * 1000 if written else 0.0,
+            'write_latency_max_ms': self.max_write_latency * 1000
+        }
 
 class LX16ADriver:
-    def __init__(self, port='/dev/ttyUSB0', baudrate=115200):
+    def __init__(self, port='/dev/ttyUSB0', baudrate=115200, transport=None, ping_ids=None):
+        """
+        port: serial device of the BusLinker, or EMULATOR_PORT for an emulated bus
+        transport: already open serial-like object to use instead of opening port
+        ping_ids: servo IDs used to check the bus is answering (default: SERVO_MAP)
+        """
         self.port = port
         self.baudrate = baudrate
-        self.ser = None
+        self.ser = transport
+        self.ping_ids = list(SERVO_MAP.values()) if ping_ids is None else list(ping_ids)
+        self.encoder = FrameEncoder()
+        # Wait-write packets followed by one broadcast start: all servos move on the same edge
+        self.sync_encoder = FrameEncoder(
+            command=SERVO_MOVE_TIME_WAIT_WRITE,
+            trailer=build_packet(BROADCAST_ID, SERVO_MOVE_START)
+        )
+        self.last_frame_skew = 0.0
+        self.bus_free_at = 0.0
+        self.lock = threading.Lock()
+        # Held for a whole read: readers share the input buffer and the parser
+        self.read_lock = threading.Lock()
+        self.writer = None
+        self.parser = PacketParser()
+        self.instrumentation = None
         self.connect()
     
     def connect(self):
-        """Initialize serial connection to BusLinker"""
+        """
+        Initialize serial connection to BusLinker
+        Instead of a fixed settle delay, returns as soon as a servo answers a ping.
+        """
+        if self.ser is not None:
+            return
+        if self.port == EMULATOR_PORT:
+            from lx16a_emulator import EmulatedBus
+            self.ser = EmulatedBus(self.baudrate)
+            print("Using emulated LX-16A bus")
+            return
+        
         try:
-            self.ser = serial.Serial(self.port, self.baudrate, timeout=1)
-            time.sleep(2)
+            start = time.monotonic()
+            self.ser = serial.Serial(self.port, self.baudrate, timeout=READ_POLL_TIMEOUT)
             print(f"Connected to BusLinker on {self.port}")
         except Exception as e:
             print(f"Connection error: {e}")
             raise
+        
+        answered = self.wait_ready()
+        if answered:
+            print(f"Bus ready: {len(answered)} servo(s) answered in "
+                  f"{(time.monotonic() - start) * 1000:.0f} ms")
+        else:
+            print(f"Warning: no servo answered on {self.port} within {READY_TIMEOUT} s")
+    
+    def ping(self, servo_ids=None, timeout=PING_TIMEOUT):
+        """IDs of the servos that answer an ID read (default: ping_ids)"""
+        servo_ids = self.ping_ids if servo_ids is None else servo_ids
+        results = self.read(servo_ids, SERVO_ID_READ, timeout)
+        return [servo_id for servo_id, value in results.items() if value is not None]
+    
+    def wait_ready(self, timeout=READY_TIMEOUT):
+        """Ping until the bus answers or timeout; returns the answering IDs (empty on timeout)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            answered = self.ping()
+            if answered or time.monotonic() >= deadline:
+                return answered
+    
+    def bus_time(self, num_bytes):
+        """Seconds needed to transmit num_bytes at the current baud rate"""
+        return num_bytes * BITS_PER_BYTE / self.baudrate
+    
+    def write(self, data, reply_bytes=0):
+        """
+        Write raw bytes, paced by bus bandwidth
+        Waits until the previous write has left the bus so writes never
+        queue up in the adapter, then books the bus for this one.
+        reply_bytes: size of the reply the write triggers, also kept off-limits
+        """
+        instr = self.instrumentation
+        with self.lock:
+            now = time.monotonic()
+            if now < self.bus_free_at:
+                time.sleep(self.bus_free_at - now)
+                now = self.bus_free_at
+            if instr:
+                start = instr.now()
+            self.ser.write(data)
+            if instr:
+                instr.record('serial_write', start)
+            self.bus_free_at = now + self.bus_time(len(data) + reply_bytes)
+            if reply_bytes:
+                self.bus_free_at += RESPONSE_GAP
     
     def send_command(self, servo_id, command, data=[]):
         """Send command to LX-16A servo"""
-        packet = [0x55, 0x55, servo_id, len(data) + 3, command] + data
-        checksum = sum(packet[2:]) & 0xFF
-        packet.append(checksum)
+        instr = self.instrumentation
+        if instr:
+            start = instr.now()
+        packet = build_packet(servo_id, command, data)
+        if instr:
+            instr.record('send_command', start)
         
         try:
-            self.ser.write(bytearray(packet))
-            time.sleep(0.01)
+            self.write(packet)
         except Exception as e:
             print(f"Command error to servo {servo_id}: {e}")
     
@@ -39,19 +364,331 @@ class LX16ADriver:
         time_low = move_time & 0xFF
         time_high = (move_time >> 8) & 0xFF
         
-        self.send_command(servo_id, 0x03, [time_low, time_high, pos_low, pos_high])
+        self.send_command(servo_id, SERVO_MOVE_TIME_WRITE, [time_low, time_high, pos_low, pos_high])
+    
+    @staticmethod
+    def angle_to_position(angle):
+        """Convert servo angle in degrees (0-240) to position (0-1000)"""
+        return int((angle / 240.0) * 1000)
     
     def set_angle(self, servo_id, angle, move_time=1000):
         """Set servo angle in degrees (0-240)"""
-        position = int((angle / 240.0) * 1000)
+        position = self.angle_to_position(angle)
         self.set_position(servo_id, position, move_time)
     
+    def frame_skew(self, num_servos, synchronized=False):
+        """
+        Seconds between the first and last servo starting to move in one frame
+        Unsynchronized servos start as their own packet arrives; synchronized
+        servos all start on the broadcast start packet.
+        """
+        if synchronized or num_servos < 2:
+            return 0.0
+        return self.bus_time((num_servos - 1) * FrameEncoder.MOVE_PACKET_SIZE)
+    
+    def set_positions(self, servo_ids, positions, move_time=1000, synchronized=False, count=None):
+        """
+        Set positions (0-1000) of several servos with a single frame write
+        synchronized: send wait-writes plus one broadcast start so all servos start together
+        count: send only the first count servos, for reused buffers (default: all)
+        With the background writer running, the frame is published to it instead.
+        """
+        if self.writer is not None:
+            self.writer.publish(servo_ids, positions, move_time, synchronized, count)
+        else:
+            self.send_frame(servo_ids, positions, move_time, synchronized, count)
+    
+    def send_frame(self, servo_ids, positions, move_time=1000, synchronized=False, count=None):
+        """Encode and write one frame on the calling thread"""
+        instr = self.instrumentation
+        if instr:
+            start = instr.now()
+        count = len(servo_ids) if count is None else count
+        encoder = self.sync_encoder if synchronized else self.encoder
+        frame = encoder.encode(servo_ids, positions, move_time, count)
+        if instr:
+            instr.record('encode', start)
+        self.last_frame_skew = self.frame_skew(count, synchronized)
+        try:
+            self.write(frame)
+        except Exception as e:
+            print(f"Frame error to servos {list(servo_ids[:count])}: {e}")
+    
+    def set_angles(self, servo_ids, angles, move_time=1000, synchronized=False):
+        """Set angles (degrees, 0-240) of several servos with a single frame write"""
+        self.set_positions(servo_ids, [self.angle_to_position(a) for a in angles],
+                           move_time, synchronized)
+    
+    def start_writer(self):
+        """Send frames from a background writer thread (latest frame wins)"""
+        if self.writer is None:
+            self.writer = FrameWriter(self)
+            self.writer.start()
+        return self.writer
+    
+    def stop_writer(self):
+        """Flush the pending frame and return to writing on the calling thread"""
+        if self.writer is not None:
+            self.writer.stop()
+            self.writer = None
+    
+    @staticmethod
+    def position_to_angle(position):
+        """Convert servo position (0-1000) to angle in degrees (0-240)"""
+        return position * 240.0 / 1000
+    
+    def read(self, servo_ids, command, timeout=None):
+        """
+        Pipelined read of one value from several servos
+        Requests go out back-to-back, spaced only by the bus time of their
+        replies, and replies are matched by servo ID and command as they arrive.
+        Concurrent reads are serialized; frames may still be written meanwhile.
+        Returns: dict servo_id -> decoded value (None if the servo did not answer)
+        """
+        with self.read_lock:
+            return self._read(servo_ids, command, timeout)
+    
+    def _read(self, servo_ids, command, timeout):
+        fmt = READ_FORMATS[command]
+        reply_bytes = 6 + struct.calcsize(fmt)
+        
+        self.ser.reset_input_buffer()
+        self.parser.reset()
+        for servo_id in servo_ids:
+            self.write(build_packet(servo_id, command), reply_bytes)
+        
+        if timeout is None:
+            timeout = max(0.0, self.bus_free_at - time.monotonic()) + RESPONSE_TIMEOUT
+        deadline = time.monotonic() + timeout
+        
+        results = dict.fromkeys(servo_ids)
+        pending = set(servo_ids)
+        while pending and time.monotonic() < deadline:
+            data = self.ser.read(max(1, self.ser.in_waiting))
+            for reply_id, reply_command, params in self.parser.feed(data):
+                # Skip echoed requests (no parameters) and unrelated packets
+                if reply_command != command or len(params) != struct.calcsize(fmt):
+                    continue
+                key = BROADCAST_ID if BROADCAST_ID in pending else reply_id
+                if key in pending:
+                    results[key] = struct.unpack(fmt, params)[0]
+                    pending.discard(key)
+        return results
+    
+    def read_positions(self, servo_ids, timeout=None):
+        """Read positions (0-1000) of several servos"""
+        return self.read(servo_ids, SERVO_POS_READ, timeout)
+    
+    def read_position(self, servo_id, timeout=None):
+        """Read servo position (0-1000), None if no reply"""
+        return self.read_positions([servo_id], timeout)[servo_id]
+    
+    def read_angle(self, servo_id, timeout=None):
+        """Read servo angle in degrees, None if no reply"""
+        position = self.read_position(servo_id, timeout)
+        return None if position is None else self.position_to_angle(position)
+    
+    def read_voltage(self, servo_id, timeout=None):
+        """Read servo input voltage in millivolts, None if no reply"""
+        return self.read([servo_id], SERVO_VIN_READ, timeout)[servo_id]
+    
+    def read_temperature(self, servo_id, timeout=None):
+        """Read servo temperature in degrees C, None if no reply"""
+        return self.read([servo_id], SERVO_TEMP_READ, timeout)[servo_id]
+    
+    def read_id(self, servo_id=BROADCAST_ID, timeout=None):
+        """Read servo ID (broadcast asks the only servo on the bus), None if no reply"""
+        return self.read([servo_id], SERVO_ID_READ, timeout)[servo_id]
+    
     def servo_off(self, servo_id):
         """Turn off servo torque"""
-        self.send_command(servo_id, 0x14)
+        self.send_command(servo_id, SERVO_TORQUE_OFF)
     
     def close(self):
         """Close serial connection"""
+        self.stop_writer()
         if self.ser and self.ser.is_open:
             self.ser.close()
-            print("Closed BusLinker connection")
\ No newline at end of file
+            print("Closed BusLinker connection")
+
+class MultiBusDriver:
+    def __init__(self, bus_ports=None, servo_bus=None, baudrate=115200):
+        """
+        Several LX-16A buses driven as one, with the LX16ADriver frame interface
+        bus_ports: bus name -> serial port (default: BUS_PORTS)
+        servo_bus: servo name -> bus name (default: SERVO_BUS; unlisted servos use the first bus)
+        Each frame is split by bus and transmitted on all buses in parallel; the
+        call returns once every bus has sent its part (common frame boundary).
+        """
+        bus_ports = BUS_PORTS if bus_ports is None else bus_ports
+        servo_bus = SERVO_BUS if servo_bus is None else servo_bus
+        first_bus = next(iter(bus_ports))
+        
+        self.baudrate = baudrate
+        self.bus_of = {servo_id: servo_bus.get(name, first_bus) for name, servo_id in SERVO_MAP.items()}
+        self.drivers = {}
+        for bus, port in bus_ports.items():
+            ids = [servo_id for servo_id, b in self.bus_of.items() if b == bus]
+            transport = None
+            if port == EMULATOR_PORT:
+                from lx16a_emulator import EmulatedBus
+                transport = EmulatedBus(baudrate, servo_ids=ids)
+            self.drivers[bus] = LX16ADriver(port, baudrate, transport=transport, ping_ids=ids)
+        
+        self.executor = ThreadPoolExecutor(max_workers=len(self.drivers),
+                                           thread_name_prefix='lx16a-bus')
+        self._instrumentation = None
+    
+    @classmethod
+    def from_config(cls, baudrate=115200):
+        """Driver for BUS_PORTS/SERVO_BUS in robot_config"""
+        return cls(BUS_PORTS, SERVO_BUS, baudrate)
+    
+    @property
+    def instrumentation(self):
+        return self._instrumentation
+    
+    @instrumentation.setter
+    def instrumentation(self, instrumentation):
+        self._instrumentation = instrumentation
+        for driver in self.drivers.values():
+            driver.instrumentation = instrumentation
+    
+    angle_to_position = staticmethod(LX16ADriver.angle_to_position)
+    position_to_angle = staticmethod(LX16ADriver.position_to_angle)
+    
+    def driver_for(self, servo_id):
+        """LX16ADriver of the bus a servo is on"""
+        return self.drivers[self.bus_of.get(servo_id, next(iter(self.drivers)))]
+    
+    def split(self, servo_ids, values):
+        """Group (servo_ids, values) by bus: bus name -> (ids, values)"""
+        groups = {}
+        for servo_id, value in zip(servo_ids, values):
+            ids, vals = groups.setdefault(self.bus_of.get(servo_id, next(iter(self.drivers))), ([], []))
+            ids.append(servo_id)
+            vals.append(value)
+        return groups
+    
+    def _send_bus(self, bus, servo_ids, positions, move_time, synchronized, delay):
+        if delay > 0:
+            time.sleep(delay)
+        self.drivers[bus].set_positions(servo_ids, positions, move_time, synchronized)
+    
+    def set_positions(self, servo_ids, positions, move_time=1000, synchronized=False, count=None):
+        """
+        Send one frame split across buses in parallel
+        synchronized: each bus uses wait-write + broadcast start, and shorter bus
+        frames are delayed so every bus's start packet lands at the same time.
+        count: send only the first count servos (default: all)
+        """
+        if count is not None:
+            servo_ids = servo_ids[:count]
+            positions = positions[:count]
+        groups = self.split(servo_ids, positions)
+        if len(groups) == 1:
+            (bus, (ids, vals)), = groups.items()
+            self.drivers[bus].set_positions(ids, vals, move_time, synchronized)
+            return
+        
+        airtime = {bus: self.drivers[bus].bus_time(len(ids) * FrameEncoder.MOVE_PACKET_SIZE)
+                   for bus, (ids, _) in groups.items()}
+        longest = max(airtime.values())
+        futures = [
+            self.executor.submit(self._send_bus, bus, ids, vals, move_time, synchronized,
+                                 longest - airtime[bus] if synchronized else 0.0)
+            for bus, (ids, vals) in groups.items()
+        ]
+        for future in futures:
+            future.result()
+    
+    def set_angles(self, servo_ids, angles, move_time=1000, synchronized=False):
+        self.set_positions(servo_ids, [self.angle_to_position(a) for a in angles],
+                           move_time, synchronized)
+    
+    def set_position(self, servo_id, position, move_time=1000):
+        self.driver_for(servo_id).set_position(servo_id, position, move_time)
+    
+    def set_angle(self, servo_id, angle, move_time=1000):
+        self.driver_for(servo_id).set_angle(servo_id, angle, move_time)
+    
+    def send_command(self, servo_id, command, data=[]):
+        self.driver_for(servo_id).send_command(servo_id, command, data)
+    
+    def servo_off(self, servo_id):
+        self.driver_for(servo_id).servo_off(servo_id)
+    
+    def read(self, servo_ids, command, timeout=None):
+        """Pipelined read on all buses in parallel; returns servo_id -> value"""
+        groups = self.split(servo_ids, servo_ids)
+        futures = [self.executor.submit(self.drivers[bus].read, ids, command, timeout)
+                   for bus, (ids, _) in groups.items()]
+        results = dict.fromkeys(servo_ids)
+        for future in futures:
+            results.update(future.result())
+        return results
+    
+    def read_positions(self, servo_ids, timeout=None):
+        return self.read(servo_ids, SERVO_POS_READ, timeout)
+    
+    def read_position(self, servo_id, timeout=None):
+        return self.driver_for(servo_id).read_position(servo_id, timeout)
+    
+    def read_angle(self, servo_id, timeout=None):
+        return self.driver_for(servo_id).read_angle(servo_id, timeout)
+    
+    def read_voltage(self, servo_id, timeout=None):
+        return self.driver_for(servo_id).read_voltage(servo_id, timeout)
+    
+    def read_temperature(self, servo_id, timeout=None):
+        return self.driver_for(servo_id).read_temperature(servo_id, timeout)
+    
+    def start_writer(self):
+        """Background writer per bus; frames are then published without blocking"""
+        return {bus: driver.start_writer() for bus, driver in self.drivers.items()}
+    
+    def stop_writer(self):
+        for driver in self.drivers.values():
+            driver.stop_writer()
+    
+    def close(self):
+        for driver in self.drivers.values():
+            driver.close()
+        self.executor.shutdown()
+
+def candidate_ports():
+    """Serial devices a BusLinker may appear as"""
+    return sorted(glob.glob('/dev/ttyUSB*')) + sorted(glob.glob('/dev/ttyACM*'))
+
+def probe_port(port, baudrate=115200, timeout=1.0):
+    """Return the servo IDs answering on port (empty if none or the port fails)"""
+    try:
+        ser = serial.Serial(port, baudrate, timeout=READ_POLL_TIMEOUT)
+    except Exception:
+        return []
+    try:
+        return LX16ADriver(port, baudrate, transport=ser).wait_ready(timeout)
+    except Exception:
+        return []
+    finally:
+        ser.close()
+
+def probe_ports(candidates=None, baudrate=115200, timeout=1.0):
+    """
+    Ping candidate ports concurrently with a protocol-level ID read
+    Returns: the first port whose bus answers, or None
+    """
+    candidates = candidate_ports() if candidates is None else list(candidates)
+    if not candidates:
+        return None
+    
+    executor = ThreadPoolExecutor(max_workers=len(candidates))
+    futures = {executor.submit(probe_port, port, baudrate, timeout): port for port in candidates}
+    found = None
+    for future in as_completed(futures):
+        if future.result():
+            found = futures[future]
+            break
+    # Don't wait for the slower probes; they time out and close their ports on their own
+    executor.shutdown(wait=False)
+    return found
@@ -0,0 +1,192 @@
+import struct
+import threading
+import time
+from lx16a_driver import (
+    PacketParser, build_packet, BITS_PER_BYTE, RESPONSE_GAP, BROADCAST_ID, READ_FORMATS,
+    SERVO_MOVE_TIME_WRITE, SERVO_MOVE_TIME_WAIT_WRITE, SERVO_MOVE_START, SERVO_TORQUE_OFF,
+    SERVO_ID_READ, SERVO_TEMP_READ, SERVO_VIN_READ, SERVO_POS_READ
+)
+from robot_config import SERVO_MAP
+
+class EmulatedServo:
+    def __init__(self, servo_id, position=500, min_position=0, max_position=1000,
+                 temperature=35, voltage=7400):
+        """
+        Kinematic model of one LX-16A servo
+        Positions are in servo units (0-1000); min/max_position model the
+        physical stops of the joint it drives.
+        """
+        self.servo_id = servo_id
+        self.min_position = min_position
+        self.max_position = max_position
+        self.temperature = temperature
+        self.voltage = voltage
+        self.torque = True
+        
+        self.start_position = float(position)
+        self.target = float(position)
+        self.move_start = 0.0
+        self.move_time = 0.0
+        self.pending = None
+    
+    def position_at(self, t):
+        """Position at time t, moving linearly toward the target over move_time"""
+        if self.move_time <= 0 or t >= self.move_start + self.move_time:
+            position = self.target
+        elif t <= self.move_start:
+            position = self.start_position
+        else:
+            frac = (t - self.move_start) / self.move_time
+            position = self.start_position + (self.target - self.start_position) * frac
+        return max(self.min_position, min(self.max_position, position))
+    
+    def move(self, t, position, move_time_ms):
+        """Start moving toward position at time t"""
+        self.start_position = self.position_at(t)
+        self.target = float(position)
+        self.move_start = t
+        self.move_time = move_time_ms / 1000.0
+        self.torque = True
+    
+    def stop_torque(self, t):
+        """Unload the servo, holding it where it is"""
+        self.start_position = self.target = self.position_at(t)
+        self.move_time = 0.0
+        self.torque = False
+
+class EmulatedBus:
+    def __init__(self, baudrate=115200, servo_ids=None, echo=False, timeout=0.005):
+        """
+        Drop-in serial transport emulating a BusLinker with LX-16A servos
+        Decodes real protocol packets, times each one by its transmission at
+        baudrate, moves servos toward their targets and answers read commands.
+        servo_ids: IDs on the bus (default: SERVO_MAP)
+        echo: return transmitted bytes like a half-duplex adapter does
+        """
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.echo = echo
+        self.is_open = True
+        
+        ids = SERVO_MAP.values() if servo_ids is None else servo_ids
+        self.servos = {servo_id: EmulatedServo(servo_id) for servo_id in ids}
+        self.parser = PacketParser()
+        self.start_times = {}
+        
+        self._lock = threading.Lock()
+        self._rx = []             # (available_at, bytes) in arrival order
+        self.wire_free_at = 0.0
+        self.bytes_written = 0
+        self.packets_received = 0
+    
+    def byte_time(self, num_bytes):
+        """Seconds to transmit num_bytes on the emulated bus"""
+        return num_bytes * BITS_PER_BYTE / self.baudrate
+    
+    def write(self, data):
+        """Accept bytes like pyserial; each packet takes effect when its last byte arrives"""
+        data = bytes(data)
+        with self._lock:
+            t = max(time.monotonic(), self.wire_free_at)
+            self.bytes_written += len(data)
+            if self.echo:
+                self._rx.append((t + self.byte_time(len(data)), data))
+            
+            # Packets take effect in order, each when its last byte is off the wire
+            for servo_id, command, params in self.parser.feed(data):
+                t += self.byte_time(6 + len(params))
+                self.packets_received += 1
+                self._handle(t, servo_id, command, params)
+            
+            self.wire_free_at = max(t, self.wire_free_at)
+        return len(data)
+    
+    def _targets(self, servo_id):
+        if servo_id == BROADCAST_ID:
+            return list(self.servos.values())
+        servo = self.servos.get(servo_id)
+        return [servo] if servo is not None else []
+    
+    def _handle(self, t, servo_id, command, params):
+        targets = self._targets(servo_id)
+        
+        if command in (SERVO_MOVE_TIME_WRITE, SERVO_MOVE_TIME_WAIT_WRITE) and len(params) == 4:
+            move_time, position = struct.unpack('<HH', params)
+            for servo in targets:
+                if command == SERVO_MOVE_TIME_WRITE:
+                    servo.move(t, position, move_time)
+                    self.start_times[servo.servo_id] = t
+                else:
+                    servo.pending = (position, move_time)
+        elif command == SERVO_MOVE_START:
+            for servo in targets:
+                if servo.pending is not None:
+                    servo.move(t, *servo.pending)
+                    servo.pending = None
+                    self.start_times[servo.servo_id] = t
+        elif command == SERVO_TORQUE_OFF:
+            for servo in targets:
+                servo.stop_torque(t)
+        elif command in READ_FORMATS and not params:
+            # A broadcast read is only answered when exactly one servo is on the bus
+            if len(targets) != 1:
+                return
+            servo = targets[0]
+            value = {
+                SERVO_ID_READ: servo.servo_id,
+                SERVO_TEMP_READ: servo.temperature,
+                SERVO_VIN_READ: servo.voltage,
+                SERVO_POS_READ: int(round(servo.position_at(t)))
+            }[command]
+            reply = build_packet(servo.servo_id, command, struct.pack(READ_FORMATS[command], value))
+            t_reply = t + RESPONSE_GAP + self.byte_time(len(reply))
+            self.wire_free_at = max(self.wire_free_at, t_reply)
+            self._rx.append((t_reply, reply))
+    
+    def start_skew(self, servo_ids=None):
+        """Spread (seconds) between the latest move start times of the given servos"""
+        ids = self.servos.keys() if servo_ids is None else servo_ids
+        times = [self.start_times[i] for i in ids if i in self.start_times]
+        return max(times) - min(times) if times else 0.0
+    
+    def positions(self, t=None):
+        """Current positions of all servos (0-1000)"""
+        t = time.monotonic() if t is None else t
+        return {servo_id: servo.position_at(t) for servo_id, servo in self.servos.items()}
+    
+    @property
+    def in_waiting(self):
+        now = time.monotonic()
+        with self._lock:
+            return sum(len(data) for available, data in self._rx if available <= now)
+    
+    def read(self, size=1):
+        """Read up to size available bytes, waiting up to timeout for the first"""
+        deadline = time.monotonic() + (self.timeout or 0)
+        out = bytearray()
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                while self._rx and self._rx[0][0] <= now and len(out) < size:
+                    available, data = self._rx[0]
+                    take = size - len(out)
+                    out.extend(data[:take])
+                    if take < len(data):
+                        self._rx[0] = (available, data[take:])
+                    else:
+                        self._rx.pop(0)
+                next_at = self._rx[0][0] if self._rx else None
+            if out or now >= deadline:
+                return bytes(out)
+            wait = deadline - now if next_at is None else min(deadline, next_at) - now
+            time.sleep(max(0.0, wait))
+    
+    def reset_input_buffer(self):
+        with self._lock:
+            self._rx.clear()
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.is_open = False
@@ -1,15 +1,35 @@
 #!/usr/bin/env python3
 import time
+START_TIME = time.perf_counter()
 import sys
-from lx16a_driver import LX16ADriver
+from lx16a_driver import LX16ADriver, MultiBusDriver, probe_ports
+from robot_config import BUS_PORTS
 from gait_controller import GaitController
+IMPORT_TIME = time.perf_counter() - START_TIME
 
 class QuadrupedRobot:
-    def __init__(self, port='/dev/ttyUSB0'):
+    def __init__(self, port='auto'):
+        """
+        port: serial device, 'emulator', or 'auto' to probe for the BusLinker
+        With several buses in BUS_PORTS, those ports are used instead.
+        """
         try:
-            self.driver = LX16ADriver(port)
+            connect_start = time.perf_counter()
+            if len(BUS_PORTS) > 1:
+                self.driver = MultiBusDriver.from_config()
+            elif port == 'auto':
+                found = probe_ports()
+                port = found or '/dev/ttyUSB0'
+                print(f"Servo bus found on {found}" if found else
+                      f"No servo bus answered, falling back to {port}")
+                self.driver = LX16ADriver(port)
+            else:
+                self.driver = LX16ADriver(port)
             self.gait = GaitController(self.driver)
+            connect_time = time.perf_counter() - connect_start
             print("Quadruped robot initialized successfully!")
+            print(f"Startup: imports {IMPORT_TIME * 1000:.0f} ms, "
+                  f"connect {connect_time * 1000:.0f} ms")
         except Exception as e:
             print(f"Failed to initialize robot: {e}")
             sys.exit(1)
@@ -58,6 +78,7 @@ class QuadrupedRobot:
         print("  s - Sit down")
         print("  l - Turn left")
         print("  r - Turn right")
+        print("  d - Drive (continuous, steerable gait)")
         print("  t - Test servos")
         print("  i - Test inverse kinematics")
         print("  q - Quit")
@@ -92,6 +113,8 @@ class QuadrupedRobot:
                 angle = input("Turn angle (default 30): ").strip()
                 angle = int(angle) if angle.isdigit() else 30
                 self.gait.turn_right(angle)
+            elif cmd == 'd':
+                self.drive()
             elif cmd == 't':
                 self.test_servos()
             elif cmd == 'i':
@@ -99,24 +122,65 @@ class QuadrupedRobot:
             else:
                 print("Invalid command. Please try again.")
     
+    def drive(self):
+        """Steer the background gait; each command applies on the next control tick"""
+        print("Drive: w faster, x slower/back, a left, d right, space stop, "
+              "g toggle trot/walk, q back to menu")
+        runtime = self.gait.start_runtime()
+        speed = turn_rate = 0.0
+        while True:
+            cmd = input("drive> ").lower()
+            if cmd.strip() == 'q':
+                break
+            elif cmd == '' or cmd.isspace():
+                speed = turn_rate = 0.0
+            elif cmd.strip() == 'w':
+                speed = min(runtime.max_speed, speed + 0.25)
+            elif cmd.strip() == 'x':
+                speed = max(-runtime.max_speed, speed - 0.25)
+            elif cmd.strip() == 'a':
+                turn_rate = min(runtime.max_turn_rate, turn_rate + 0.25)
+            elif cmd.strip() == 'd':
+                turn_rate = max(-runtime.max_turn_rate, turn_rate - 0.25)
+            elif cmd.strip() == 'g':
+                runtime.set_gait('walk' if runtime.target_gait == 'trot' else 'trot')
+            else:
+                print("Invalid drive command.")
+                continue
+            runtime.set_velocity(speed, turn_rate)
+            state = runtime.state()
+            print(f"speed {speed:+.2f}, turn {turn_rate:+.2f}, gait {state['target_gait']}")
+        self.gait.stop_runtime()
+    
     def shutdown(self):
         """Safe shutdown"""
         print("\nShutting down robot...")
         self.gait.neutral_position()
         time.sleep(1)
+        if self.gait.instrumentation:
+            self.gait.instrumentation.report()
         self.driver.close()
         print("Robot shutdown complete.")
 
 def main():
     # Check for custom port
-    port = '/dev/ttyUSB0'
-    if len(sys.argv) > 1:
-        port = sys.argv[1]
+    port = 'auto'
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if args:
+        port = args[0]
     
     robot = QuadrupedRobot(port)
+    if '--profile' in sys.argv:
+        # Report per-stage control path timing at shutdown
+        robot.gait.enable_instrumentation()
     
     try:
-        robot.interactive_control()
+        if '--teleop' in sys.argv:
+            # Drive from UDP setpoints (teleop_server.TeleopClient or a joystick bridge)
+            from teleop_server import run_server
+            run_server(robot.gait)
+        else:
+            robot.interactive_control()
     except KeyboardInterrupt:
         print("\nProgram interrupted by user")
     except Exception as e:
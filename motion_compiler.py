@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Offline motion compiler: named motions -> quantized servo frame files (motion_file)
+import argparse
+import numpy as np
+from robot_config import SERVO_MAP, LEG_DIMENSIONS, WALK_CONFIG
+from inverse_kinematics import LegIK, JOINT_NAMES
+from gait_planner import GaitPlanner
+from servo_commands import ServoCommandStage
+from motion_file import motion_path, write_motion
+from motion_validator import validate_positions, format_report
+
+MOTIONS = ('stand', 'sit', 'trot', 'walk', 'turn_left', 'turn_right')
+
+def make_planner():
+    """GaitPlanner for offline use (no controller attached)"""
+    leg_ik = LegIK(
+        thigh_length=LEG_DIMENSIONS['thigh_length'],
+        shin_length=LEG_DIMENSIONS['shin_length']
+    )
+    return GaitPlanner(None, leg_ik)
+
+def compile_motion(name, planner, stage, speed=1.0, rate=None):
+    """
+    Compute a motion's quantized frames
+    Poses are one frame; gaits are one full cycle sampled at the control rate.
+    Returns: (frames array N x 8 in JOINT_NAMES order, frame_period_ms, move_time_ms)
+    """
+    if name in ('stand', 'sit'):
+        angles = planner.stand_angles() if name == 'stand' else planner.sit_angles()
+        move_time = 1000 if name == 'stand' else 1500
+        joint_angles = [[angles[joint] for joint in JOINT_NAMES]]
+        return stage.positions(joint_angles), move_time, move_time
+    
+    rate = WALK_CONFIG['control_rate'] if rate is None else rate
+    if name in ('trot', 'walk'):
+        step_time = planner.step_period / speed
+        gait = planner.compile_gait(name)
+    elif name in ('turn_left', 'turn_right'):
+        step_time = planner.step_period
+        gait = planner.compile_gait('trot', step_length=planner.step_length/2,
+                                    x_offsets=planner.turn_offsets(name.split('_')[1]))
+    else:
+        raise ValueError(f"Unknown motion '{name}', expected one of {MOTIONS}")
+    
+    num_frames = max(1, int(round(step_time * rate)))
+    frame_period = int(round(1000 / rate))
+    angles = np.array([gait.angles_at(i / num_frames) for i in range(num_frames)])
+    return stage.positions(angles), frame_period, frame_period
+
+def compile_motions(names, speed=1.0, rate=None, output=None, strict=False):
+    """
+    Compile and write named motions; returns the written paths
+    Gaits are checked with motion_validator; strict skips the ones that fail.
+    """
+    planner = make_planner()
+    stage = ServoCommandStage.from_file()
+    servo_ids = [SERVO_MAP[joint] for joint in JOINT_NAMES]
+    
+    paths = []
+    for name in names:
+        frames, frame_period, move_time = compile_motion(name, planner, stage, speed, rate)
+        if len(frames) > 1:
+            report = validate_positions(frames, frame_period, move_time, cyclic=True)
+            print(f"Checked {name}: {format_report(report)}")
+            if not report['feasible'] and strict:
+                print(f"Skipped {name}")
+                continue
+        path = motion_path(name) if output is None else output
+        write_motion(path, servo_ids, frames.tolist(), frame_period, move_time)
+        print(f"Compiled {name}: {len(frames)} frames, {frame_period} ms/frame -> {path}")
+        paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile motions into servo frame files")
+    parser.add_argument('motions', nargs='*', default=list(MOTIONS),
+                        help=f"Motions to compile (default: all of {', '.join(MOTIONS)})")
+    parser.add_argument('--speed', type=float, default=1.0, help="Gait speed factor")
+    parser.add_argument('--rate', type=int, default=None, help="Frames per second for gaits")
+    parser.add_argument('--output', default=None, help="Output path (single motion only)")
+    parser.add_argument('--strict', action='store_true', help="Do not write motions that fail validation")
+    args = parser.parse_args()
+    
+    if args.output and len(args.motions) != 1:
+        parser.error("--output needs exactly one motion")
+    compile_motions(args.motions, args.speed, args.rate, args.output, args.strict)
+
+if __name__ == "__main__":
+    main()
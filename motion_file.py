@@ -0,0 +1,84 @@
+# Precompiled motion files: quantized servo frames ready to stream to the driver.
+# Reading uses only the standard library (mmap + memoryview) so playback does not
+# need NumPy or the IK/gait modules.
+import mmap
+import os
+import struct
+import sys
+from array import array
+from robot_config import MOTION_DIR
+
+# Header: magic, version, servo count, frame period (ms), move time (ms), frame count
+HEADER = struct.Struct('<4sHHHHI')
+MAGIC = b'QDMF'
+VERSION = 1
+EXTENSION = '.motion'
+
+def motion_path(name):
+    """Path of a motion by name (in MOTION_DIR), or name itself if it is a path"""
+    if os.sep in name or name.endswith(EXTENSION):
+        return name
+    base = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, MOTION_DIR, name + EXTENSION)
+
+def write_motion(path, servo_ids, frames, frame_period, move_time):
+    """
+    Write a motion file
+    servo_ids: servo ID of each column
+    frames: sequence of frames, each a sequence of positions (0-1000) per servo
+    frame_period, move_time: milliseconds
+    """
+    positions = array('H')
+    for frame in frames:
+        positions.extend(int(p) for p in frame)
+    if sys.byteorder != 'little':
+        positions.byteswap()
+    ids = array('H', servo_ids)
+    if sys.byteorder != 'little':
+        ids.byteswap()
+    
+    num_frames = len(positions) // len(servo_ids)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(servo_ids), frame_period, move_time, num_frames))
+        f.write(ids.tobytes())
+        f.write(positions.tobytes())
+    return num_frames
+
+class MotionFile:
+    def __init__(self, path):
+        """Memory-mapped motion file; frames are read directly from the mapping"""
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version, num_servos, frame_period, move_time, num_frames = \
+            HEADER.unpack_from(self.mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} motion file")
+        
+        self.num_servos = num_servos
+        self.frame_period = frame_period
+        self.move_time = move_time
+        self.num_frames = num_frames
+        
+        ids_offset = HEADER.size
+        data_offset = ids_offset + 2 * num_servos
+        self._view = memoryview(self.mmap)
+        self.servo_ids = list(struct.unpack_from(f'<{num_servos}H', self.mmap, ids_offset))
+        # Native-order view of the positions (little-endian hosts, e.g. the Pi)
+        self.positions = self._view[data_offset:data_offset + 2 * num_servos * num_frames].cast('H')
+    
+    def __len__(self):
+        return self.num_frames
+    
+    def frame(self, index):
+        """Positions of one frame as a list"""
+        start = index * self.num_servos
+        return self.positions[start:start + self.num_servos].tolist()
+    
+    def close(self):
+        self.positions.release()
+        self._view.release()
+        self.mmap.close()
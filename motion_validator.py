@@ -0,0 +1,127 @@
+import numpy as np
+from robot_config import ANGLE_LIMITS, SERVO_MAX_SPEED
+from inverse_kinematics import JOINT_NAMES
+from lx16a_driver import BITS_PER_BYTE, BROADCAST_ID, SERVO_MOVE_START, FrameEncoder, build_packet
+
+# Bytes of the broadcast start packet that ends a synchronized frame
+START_PACKET_SIZE = len(build_packet(BROADCAST_ID, SERVO_MOVE_START))
+
+class InfeasibleMotion(ValueError):
+    """A planned motion failed validation"""
+
+def joint_limits(joint_names=JOINT_NAMES):
+    """(lower, upper) arrays of ANGLE_LIMITS for the joints, by joint type"""
+    limits = np.array([ANGLE_LIMITS[name.rsplit('_', 1)[1]] for name in joint_names], dtype=float)
+    return limits[:, 0], limits[:, 1]
+
+def validate_angles(angles, frame_period, move_time=None, cyclic=False, joint_names=JOINT_NAMES,
+                    limits=None, max_speed=SERVO_MAX_SPEED, speed_margin=0.8,
+                    max_acceleration=None, baudrate=115200, synchronized=False):
+    """
+    Check a planned joint angle sequence in one vectorized pass
+    angles: (N frames x J joints) in degrees, columns in joint_names order
+    frame_period: ms between frames; move_time: ms each servo gets per frame
+                  (default: frame_period)
+    cyclic: the sequence repeats (gait cycle), so the last frame moves to the first
+    limits: (lower, upper) arrays; default ANGLE_LIMITS by joint type
+    speed_margin: fraction of max_speed (no-load) usable under load
+    max_acceleration: deg/s^2 limit, None to only report it
+    baudrate, synchronized: bus the frames are sent on, for bus time per frame
+    Returns: report dict, 'feasible' False and 'problems' listing why if it fails
+    """
+    angles = np.atleast_2d(np.asarray(angles, dtype=float))
+    move_time = frame_period if move_time is None else move_time
+    lower, upper = joint_limits(joint_names) if limits is None else limits
+    num_frames, num_joints = angles.shape
+    period = frame_period / 1000.0
+    
+    # Per-frame moves; a cycle also moves from its last frame back to the first
+    moves = np.diff(angles, axis=0, append=angles[:1]) if cyclic else np.diff(angles, axis=0)
+    speed = np.abs(moves) / (move_time / 1000.0)  # What each servo must sustain, deg/s
+    velocity = moves / period
+    if len(velocity) > 1:
+        change = np.diff(velocity, axis=0, append=velocity[:1]) if cyclic else np.diff(velocity, axis=0)
+        acceleration = np.abs(change) / period
+    else:
+        acceleration = np.zeros((0, num_joints))
+    
+    allowed_speed = max_speed * speed_margin
+    too_fast = speed > allowed_speed
+    below = np.maximum(lower - angles, 0.0)
+    above = np.maximum(angles - upper, 0.0)
+    excess = np.maximum(below, above)
+    out_of_limits = excess > 0
+    too_jerky = acceleration > max_acceleration if max_acceleration is not None else \
+        np.zeros(acceleration.shape, dtype=bool)
+    
+    # Every servo of every frame, plus the broadcast start when synchronized
+    frame_bytes = num_joints * FrameEncoder.MOVE_PACKET_SIZE + (START_PACKET_SIZE if synchronized else 0)
+    bus_time = frame_bytes * BITS_PER_BYTE / baudrate * 1000.0
+    
+    def worst(values):
+        if values.size == 0:
+            return None
+        frame, joint = np.unravel_index(np.argmax(values), values.shape)
+        return {'joint': joint_names[joint], 'frame': int(frame), 'value': float(values[frame, joint])}
+    
+    report = {
+        'frames': num_frames,
+        'frame_period_ms': frame_period,
+        'move_time_ms': move_time,
+        'max_speed_dps': float(speed.max()) if speed.size else 0.0,
+        'allowed_speed_dps': allowed_speed,
+        'speed_violations': int(too_fast.sum()),
+        'worst_speed': worst(speed),
+        'max_acceleration_dps2': float(acceleration.max()) if acceleration.size else 0.0,
+        'acceleration_violations': int(too_jerky.sum()),
+        'limit_violations': int(out_of_limits.sum()),
+        'worst_limit': worst(excess) if out_of_limits.any() else None,
+        'bus_time_ms': bus_time,
+        'bus_utilization': bus_time / frame_period if frame_period > 0 else float('inf'),
+        'problems': []
+    }
+    
+    problems = report['problems']
+    if report['speed_violations']:
+        w = report['worst_speed']
+        problems.append(f"{report['speed_violations']} joint moves faster than {allowed_speed:.0f} deg/s "
+                        f"(worst {w['joint']} at frame {w['frame']}: {w['value']:.0f} deg/s)")
+    if report['limit_violations']:
+        w = report['worst_limit']
+        problems.append(f"{report['limit_violations']} joint angles outside limits "
+                        f"(worst {w['joint']} at frame {w['frame']}: {w['value']:.1f} deg beyond)")
+    if report['acceleration_violations']:
+        w = worst(acceleration)
+        problems.append(f"{report['acceleration_violations']} joint accelerations above "
+                        f"{max_acceleration:.0f} deg/s^2 (worst {w['joint']}: {w['value']:.0f})")
+    if report['bus_utilization'] > 1.0:
+        problems.append(f"frames need {bus_time:.2f} ms of bus time but are {frame_period} ms apart")
+    report['feasible'] = not problems
+    return report
+
+def validate_positions(positions, frame_period, move_time=None, cyclic=False, joint_names=JOINT_NAMES,
+                       limits=None, **kwargs):
+    """
+    validate_angles for quantized servo positions (0-1000), e.g. a compiled motion
+    Positions are servo angles, so limits default to the calibrated servo limits.
+    """
+    if limits is None:
+        from servo_commands import load_calibration
+        calibration = load_calibration()
+        limits = (np.array([calibration[name]['min'] for name in joint_names], dtype=float),
+                  np.array([calibration[name]['max'] for name in joint_names], dtype=float))
+    angles = np.asarray(positions, dtype=float) * (240.0 / 1000)
+    return validate_angles(angles, frame_period, move_time, cyclic, joint_names, limits, **kwargs)
+
+def format_report(report):
+    """One-line summary of a validation report"""
+    status = "feasible" if report['feasible'] else "INFEASIBLE: " + "; ".join(report['problems'])
+    return (f"{report['frames']} frames, peak {report['max_speed_dps']:.0f} deg/s "
+            f"(allowed {report['allowed_speed_dps']:.0f}), bus {report['bus_time_ms']:.2f} ms/frame "
+            f"({report['bus_utilization'] * 100:.0f}%) - {status}")
+
+def check(report):
+    """Raise InfeasibleMotion for a failed report, otherwise return it"""
+    if not report['feasible']:
+        raise InfeasibleMotion("; ".join(report['problems']))
+    return report
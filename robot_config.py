@@ -12,6 +12,16 @@ SERVO_MAP = {
     'back_right_knee': 8
 }
 
+# Servo buses (BusLinkers): bus name -> serial port
+# With more than one bus, frames are split by bus and sent in parallel.
+BUS_PORTS = {
+    'main': '/dev/ttyUSB0'
+}
+
+# Bus of each servo; servos not listed use the first bus in BUS_PORTS
+# e.g. one bus per side: {'front_left_hip': 'left', ..., 'front_right_hip': 'right', ...}
+SERVO_BUS = {}
+
 # Neutral positions for standing (in degrees)
 NEUTRAL_ANGLES = {
     'front_left_hip': 90,
@@ -30,6 +40,18 @@ ANGLE_LIMITS = {
     'knee': (20, 160)    # Knee servos range
 }
 
+# LX-16A no-load speed in degrees/second (0.16 s per 60 degrees at 7.4 V)
+SERVO_MAX_SPEED = 375.0
+
+# Per-servo calibration (offset, direction, limits) written by calibration.py
+CALIBRATION_FILE = 'servo_calibration.json'
+
+# Directory of precompiled motion files written by motion_compiler.py
+MOTION_DIR = 'motions'
+
+# Precomputed IK workspace grid (ik_lookup.py), built on first use of LegIK.use_lookup
+IK_TABLE_FILE = 'ik_table.npz'
+
 # Leg dimensions in mm (ADJUST THESE TO YOUR ROBOT!)
 LEG_DIMENSIONS = {
     'thigh_length': 80,  # Hip to knee
@@ -43,5 +65,6 @@ WALK_CONFIG = {
     'step_height': 25,
     'step_length': 40,
     'step_speed': 1.0,
-    'body_height': 120
+    'body_height': 120,
+    'control_rate': 50   # Gait control loop ticks per second (Hz)
 }
\ No newline at end of file
@@ -0,0 +1,121 @@
+import json
+import os
+import numpy as np
+from robot_config import SERVO_MAP, NEUTRAL_ANGLES, ANGLE_LIMITS, CALIBRATION_FILE
+from inverse_kinematics import JOINT_NAMES
+
+def calibration_path(path=None):
+    """Calibration file path; the default is relative to this directory"""
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), CALIBRATION_FILE)
+    return path
+
+def default_calibration(servo_name):
+    """Calibration entry from robot_config: no offset, normal direction, ANGLE_LIMITS"""
+    joint = servo_name.rsplit('_', 1)[1]
+    lower, upper = ANGLE_LIMITS[joint]
+    return {'offset': 0.0, 'direction': 1, 'min': lower, 'max': upper}
+
+def load_calibration(path=None):
+    """
+    Load per-servo calibration, falling back to defaults for missing servos/fields
+    Returns: dict servo_name -> {'offset', 'direction', 'min', 'max'}
+    """
+    stored = {}
+    path = calibration_path(path)
+    if os.path.exists(path):
+        with open(path) as f:
+            stored = json.load(f)
+    
+    calibration = {}
+    for servo_name in SERVO_MAP:
+        entry = default_calibration(servo_name)
+        entry.update(stored.get(servo_name, {}))
+        calibration[servo_name] = entry
+    return calibration
+
+def save_calibration(updates, path=None):
+    """
+    Merge per-servo calibration fields into the calibration file
+    updates: dict servo_name -> dict of fields to set
+    """
+    path = calibration_path(path)
+    calibration = load_calibration(path)
+    for servo_name, fields in updates.items():
+        calibration[servo_name].update(fields)
+    
+    with open(path, 'w') as f:
+        json.dump(calibration, f, indent=2)
+    print(f"Calibration saved to {path}")
+    return calibration
+
+class ServoCommandStage:
+    def __init__(self, calibration=None):
+        """
+        Joint angle -> servo position conversion for all joints as array ops
+        Applies per-servo direction and offset around the neutral angle, clamps to
+        the servo's angle limits and quantizes to the 0-1000 position range.
+        calibration: dict from load_calibration (default: loaded from CALIBRATION_FILE)
+        """
+        if calibration is None:
+            calibration = load_calibration()
+        
+        self.joint_names = list(JOINT_NAMES)
+        self.index = {name: i for i, name in enumerate(self.joint_names)}
+        self.servo_ids = np.array([SERVO_MAP[name] for name in self.joint_names])
+        
+        entries = [calibration[name] for name in self.joint_names]
+        self.neutral = np.array([NEUTRAL_ANGLES[name] for name in self.joint_names], dtype=float)
+        self.direction = np.array([e['direction'] for e in entries], dtype=float)
+        self.offset = np.array([e['offset'] for e in entries], dtype=float)
+        self.lower = np.array([e['min'] for e in entries], dtype=float)
+        self.upper = np.array([e['max'] for e in entries], dtype=float)
+        
+        # servo_angle = scale * angle + bias, before clamping
+        self.scale = self.direction
+        self.bias = self.neutral * (1 - self.direction) + self.offset
+        
+        # Scratch buffer of command_frame
+        self._frame_angles = np.empty(len(self.joint_names))
+    
+    @classmethod
+    def from_file(cls, path=None):
+        """Build the stage from a calibration file"""
+        return cls(load_calibration(path))
+    
+    def servo_angles(self, angles, index=slice(None)):
+        """
+        Calibrated and clamped servo angles (degrees) for joint angles
+        angles: array whose last axis is the joints selected by index (default: all, JOINT_NAMES order)
+        """
+        servo_angle = np.asarray(angles, dtype=float) * self.scale[index] + self.bias[index]
+        return np.clip(servo_angle, self.lower[index], self.upper[index])
+    
+    def positions(self, angles, index=slice(None)):
+        """Quantized servo positions (0-1000) for joint angles, see servo_angles"""
+        position = np.trunc(self.servo_angles(angles, index) * (1000 / 240.0))
+        return np.clip(position, 0, 1000).astype(int)
+    
+    def command(self, servo_angles):
+        """
+        Convert a dict of joint angles keyed by servo name
+        Returns: (servo_ids, positions) lists in the dict's order
+        """
+        index = [self.index[name] for name in servo_angles]
+        positions = self.positions(list(servo_angles.values()), index)
+        return self.servo_ids[index].tolist(), positions.tolist()
+    
+    def command_frame(self, frame):
+        """
+        Convert all joints of a JointFrame without allocating
+        Writes the quantized positions into frame.positions; same values as positions().
+        """
+        out = self._frame_angles
+        np.multiply(frame.angle_view, self.scale, out=out)
+        out += self.bias
+        np.clip(out, self.lower, self.upper, out=out)
+        out *= 1000 / 240.0
+        np.trunc(out, out=out)
+        np.clip(out, 0, 1000, out=out)
+        frame.position_view[:] = out
+        return frame.positions
@@ -33,12 +33,20 @@ def main():
     
     # Check serial port
     print("Checking serial ports...")
-    code, stdout, stderr = run_command("ls /dev/ttyUSB* /dev/ttyACM* 2>/dev/null")
-    if code == 0:
-        ports = stdout.strip().split('\n')
-        print(f"Available serial ports: {ports}")
-    else:
-        print("No serial ports found. Make sure BusLinker is connected.")
+    try:
+        from lx16a_driver import candidate_ports, probe_ports
+        ports = candidate_ports()
+        if ports:
+            print(f"Available serial ports: {ports}")
+            found = probe_ports(ports)
+            if found:
+                print(f"Servos answered on {found}")
+            else:
+                print("No servos answered. Check servo power and wiring.")
+        else:
+            print("No serial ports found. Make sure BusLinker is connected.")
+    except ImportError as e:
+        print(f"Cannot probe serial ports: {e}")
     
     # Set permissions for serial port
     print("Setting serial port permissions...")
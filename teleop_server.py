@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# UDP teleoperation: setpoints from a joystick/remote applied to the running GaitRuntime
+import asyncio
+import json
+import math
+import socket
+import struct
+import time
+
+DEFAULT_PORT = 9870
+
+# Binary command: magic, sequence, speed, turn rate, body height, flags
+# NaN speed/turn rate/body height leaves that setpoint unchanged
+COMMAND = struct.Struct('<2sIfffB')
+COMMAND_MAGIC = b'QT'
+FLAG_STOP = 0x01
+GAIT_SHIFT = 1                     # Flags bits 1-2: gait code, 0 = unchanged
+GAIT_CODES = {1: 'trot', 2: 'walk'}
+
+# Reply: magic, sequence, accepted (0: stale), last setpoint-to-servo latency (ms)
+REPLY = struct.Struct('<2sIBf')
+REPLY_MAGIC = b'QR'
+
+SEQ_MODULUS = 1 << 32
+
+def encode_command(seq, speed=None, turn_rate=None, body_height=None, gait=None, stop=False):
+    """Binary command packet (COMMAND); None leaves a setpoint unchanged"""
+    flags = FLAG_STOP if stop else 0
+    if gait is not None:
+        code = {name: code for code, name in GAIT_CODES.items()}[gait]
+        flags |= code << GAIT_SHIFT
+    speed, turn_rate, height = (math.nan if v is None else v for v in (speed, turn_rate, body_height))
+    return COMMAND.pack(COMMAND_MAGIC, seq % SEQ_MODULUS, speed, turn_rate, height, flags)
+
+def finite(name, value):
+    """Setpoint value or None (unchanged); non-finite values are malformed"""
+    if value is not None and not math.isfinite(value):
+        raise ValueError(f"Malformed command: {name} is {value}")
+    return value
+
+def decode_command(data):
+    """
+    Parse a binary (COMMAND) or JSON command
+    JSON: {"seq": 1, "speed": 1.0, "turn_rate": 0.0, "body_height": 110, "gait": "trot", "stop": false}
+    Returns: dict with seq, speed, turn_rate, body_height, gait, stop (None: unchanged)
+    Raises ValueError for malformed commands, including infinite or NaN (JSON) values.
+    """
+    if data[:2] == COMMAND_MAGIC and len(data) == COMMAND.size:
+        _, seq, speed, turn_rate, height, flags = COMMAND.unpack(data)
+        gait_code = (flags >> GAIT_SHIFT) & 0x03
+        if gait_code and gait_code not in GAIT_CODES:
+            raise ValueError(f"Unknown gait code {gait_code}")
+        speed, turn_rate, height = (None if math.isnan(v) else v for v in (speed, turn_rate, height))
+        return {
+            'seq': seq,
+            'speed': finite('speed', speed),
+            'turn_rate': finite('turn_rate', turn_rate),
+            'body_height': finite('body_height', height),
+            'gait': GAIT_CODES.get(gait_code),
+            'stop': bool(flags & FLAG_STOP),
+            'json': False
+        }
+    try:
+        message = json.loads(data)
+        seq = int(message['seq']) % SEQ_MODULUS
+        speed, turn_rate, height = (None if message.get(name) is None else float(message[name])
+                                    for name in ('speed', 'turn_rate', 'body_height'))
+        gait = message.get('gait')
+        stop = bool(message.get('stop', False))
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Malformed command: {e}")
+    return {
+        'seq': seq,
+        'speed': finite('speed', speed),
+        'turn_rate': finite('turn_rate', turn_rate),
+        'body_height': finite('body_height', height),
+        'gait': gait,
+        'stop': stop,
+        'json': True
+    }
+
+def is_newer(seq, last):
+    """
+    Sequence number comparison with 32-bit wraparound (0 follows 2**32 - 1)
+    A restarted client sends from a new socket, so it starts over as a new address.
+    """
+    if last is None:
+        return True
+    return 0 < (seq - last) % SEQ_MODULUS < SEQ_MODULUS // 2
+
+class TeleopServer(asyncio.DatagramProtocol):
+    def __init__(self, gait_controller, command_timeout=0.5):
+        """
+        Datagram handler applying setpoints to GaitController's background runtime
+        Commands take effect on the next control tick; packets older than the last
+        one seen from the same client are dropped.
+        command_timeout: seconds without packets after which the robot stops walking
+        """
+        self.gait = gait_controller
+        self.command_timeout = command_timeout
+        self.transport = None
+        self.last_seq = {}        # client address -> last accepted sequence number
+        self.last_packet = None   # monotonic time of the last accepted command
+        self.received = 0
+        self.applied = 0
+        self.stale = 0
+        self.malformed = 0
+        self.timeouts = 0
+    
+    def connection_made(self, transport):
+        self.transport = transport
+    
+    def datagram_received(self, data, addr):
+        self.received += 1
+        try:
+            command = decode_command(data)
+        except ValueError as e:
+            self.malformed += 1
+            print(f"Teleop: {e} from {addr}")
+            return
+        
+        seq = command['seq']
+        accepted = is_newer(seq, self.last_seq.get(addr))
+        if accepted:
+            try:
+                self.apply(command)
+            except ValueError as e:
+                self.malformed += 1
+                print(f"Teleop: {e} from {addr}")
+                return
+            self.last_seq[addr] = seq
+            self.last_packet = time.monotonic()
+            self.applied += 1
+        else:
+            self.stale += 1
+        self.reply(command, accepted, addr)
+    
+    def apply(self, command):
+        """Hand a command's setpoints to the runtime (non-blocking)"""
+        runtime = self.gait.start_runtime()
+        if command['gait'] is not None:
+            runtime.set_gait(command['gait'])
+        if command['body_height'] is not None:
+            runtime.set_body_height(command['body_height'])
+        if command['stop']:
+            runtime.stop_moving()
+        elif command['speed'] is not None or command['turn_rate'] is not None:
+            runtime.set_velocity(command['speed'], command['turn_rate'])
+    
+    def reply(self, command, accepted, addr):
+        runtime = self.gait.runtime
+        latency = runtime.last_latency * 1000 if runtime is not None else 0.0
+        if command['json']:
+            data = json.dumps({'seq': command['seq'], 'accepted': accepted,
+                               'latency_ms': round(latency, 3)}).encode()
+        else:
+            data = REPLY.pack(REPLY_MAGIC, command['seq'], int(accepted), latency)
+        self.transport.sendto(data, addr)
+    
+    async def watchdog(self):
+        """Stop walking when commands stop arriving (lost link, crashed client)"""
+        while True:
+            await asyncio.sleep(self.command_timeout / 2)
+            runtime = self.gait.runtime
+            if (runtime is not None and self.last_packet is not None
+                    and time.monotonic() - self.last_packet > self.command_timeout
+                    and (runtime.target_speed or runtime.target_turn_rate)):
+                runtime.stop_moving()
+                self.last_packet = None
+                self.timeouts += 1
+                print("Teleop: no commands, stopping")
+    
+    def stats(self):
+        """Packet counters and setpoint-to-servo latency (ms)"""
+        runtime = self.gait.runtime
+        latencies = runtime.latencies if runtime is not None else None
+        return {
+            'received': self.received,
+            'applied': self.applied,
+            'stale': self.stale,
+            'malformed': self.malformed,
+            'timeouts': self.timeouts,
+            'latency_p50_ms': latencies.percentile(50) * 1000 if latencies else 0.0,
+            'latency_p99_ms': latencies.percentile(99) * 1000 if latencies else 0.0,
+            'latency_max_ms': latencies.max * 1000 if latencies else 0.0
+        }
+    
+    def report(self):
+        """Print packet and latency statistics"""
+        s = self.stats()
+        print(f"Teleop: {s['received']} packets, {s['applied']} applied, {s['stale']} stale, "
+              f"{s['malformed']} malformed, {s['timeouts']} timeouts; command-to-servo latency "
+              f"p50 {s['latency_p50_ms']:.2f} ms, p99 {s['latency_p99_ms']:.2f} ms, "
+              f"max {s['latency_max_ms']:.2f} ms")
+
+async def serve(gait_controller, host='127.0.0.1', port=DEFAULT_PORT, command_timeout=0.5):
+    """Start the UDP endpoint and its watchdog; returns (transport, server, watchdog task)"""
+    loop = asyncio.get_running_loop()
+    transport, server = await loop.create_datagram_endpoint(
+        lambda: TeleopServer(gait_controller, command_timeout), local_addr=(host, port))
+    watchdog = asyncio.ensure_future(server.watchdog())
+    return transport, server, watchdog
+
+def run_server(gait_controller, host='127.0.0.1', port=DEFAULT_PORT, command_timeout=0.5):
+    """Serve teleop commands until interrupted, then stop the gait and report"""
+    async def run():
+        transport, server, watchdog = await serve(gait_controller, host, port, command_timeout)
+        print(f"Teleop server listening on udp://{host}:{port}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            watchdog.cancel()
+            transport.close()
+            server.report()
+    
+    gait_controller.start_runtime()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        gait_controller.stop_runtime()
+
+class TeleopClient:
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, use_json=False, timeout=0.5):
+        """Blocking UDP client for testing the server (sequence numbers are automatic)"""
+        self.address = (host, port)
+        self.use_json = use_json
+        self.seq = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(timeout)
+    
+    def send(self, speed=None, turn_rate=None, body_height=None, gait=None, stop=False,
+             seq=None, wait_reply=True):
+        """
+        Send one command; seq overrides the automatic sequence number (e.g. to test drops)
+        Returns: (accepted, latency_ms, round_trip_ms), or None without a reply
+        """
+        if seq is None:
+            self.seq += 1
+            seq = self.seq
+        if self.use_json:
+            data = json.dumps({'seq': seq, 'speed': speed, 'turn_rate': turn_rate,
+                               'body_height': body_height, 'gait': gait, 'stop': stop}).encode()
+        else:
+            data = encode_command(seq, speed, turn_rate, body_height, gait, stop)
+        start = time.perf_counter()
+        self.sock.sendto(data, self.address)
+        if not wait_reply:
+            return None
+        try:
+            reply, _ = self.sock.recvfrom(1024)
+        except socket.timeout:
+            return None
+        round_trip = (time.perf_counter() - start) * 1000
+        if self.use_json:
+            message = json.loads(reply)
+            return message['accepted'], message['latency_ms'], round_trip
+        _, _, accepted, latency = REPLY.unpack(reply)
+        return bool(accepted), latency, round_trip
+    
+    def close(self):
+        self.sock.close()
+
+def main():
+    """Localhost self-test: emulated robot, server and a scripted client"""
+    from lx16a_driver import LX16ADriver
+    from gait_controller import GaitController
+    
+    gait = GaitController(LX16ADriver('emulator'))
+    gait.start_runtime()
+    
+    def drive():
+        client = TeleopClient()
+        for speed, turn_rate in ((0.5, 0.0), (1.0, 0.0), (1.0, 0.5), (0.5, -0.5)):
+            for _ in range(25):
+                client.send(speed, turn_rate)
+                time.sleep(0.02)
+        print("Stale packet accepted:", client.send(2.0, 0.0, seq=1)[0])
+        client.use_json = True
+        print("JSON reply:", client.send(speed=1.0, gait='walk', body_height=110))
+        time.sleep(1.0)
+        client.send(stop=True)
+        time.sleep(1.0)
+        client.close()
+    
+    async def self_test():
+        transport, server, watchdog = await serve(gait)
+        await asyncio.get_running_loop().run_in_executor(None, drive)
+        watchdog.cancel()
+        transport.close()
+        server.report()
+    
+    asyncio.run(self_test())
+    print(f"Final state: {gait.runtime.state()}")
+    gait.stop_runtime()
+    gait.driver.close()
+
+if __name__ == "__main__":
+    main()
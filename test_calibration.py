@@ -0,0 +1,52 @@
+import json
+import pytest
+from lx16a_driver import LX16ADriver
+from calibration import auto_calibrate, auto_find_limits
+
+RESOLUTION = 1.0
+TOLERANCE = 2.0
+
+# Physical stops (degrees) of the emulated joints; back_right_knee has none
+STOPS = {
+    'front_left_hip': (26.4, 216.72),
+    'front_left_knee': (45.36, 159.84),
+    'back_right_hip': (67.68, 201.6),
+    'back_right_knee': (0.0, 240.0)
+}
+SERVOS = {'front_left_hip': 1, 'front_left_knee': 2, 'back_right_hip': 7, 'back_right_knee': 8}
+
+@pytest.fixture(scope='module')
+def driver():
+    """Emulated bus with the STOPS set; servo 3 is configured but not on the bus"""
+    driver = LX16ADriver('emulator')
+    for name, (lower, upper) in STOPS.items():
+        servo = driver.ser.servos[SERVOS[name]]
+        servo.min_position = round(lower * 1000 / 240)
+        servo.max_position = round(upper * 1000 / 240)
+    del driver.ser.servos[3]
+    yield driver
+    driver.close()
+
+def test_auto_find_limits(driver):
+    """Found limits are at the stops, never past them (within resolution + tolerance)"""
+    limits = auto_find_limits(driver, dict(SERVOS, front_right_hip=3),
+                              resolution=RESOLUTION, tolerance=TOLERANCE)
+    assert set(limits) == set(SERVOS)
+    for name, (lower, upper) in limits.items():
+        stop_lower, stop_upper = STOPS[name]
+        assert stop_lower <= lower <= stop_lower + RESOLUTION + TOLERANCE
+        assert stop_upper - RESOLUTION - TOLERANCE <= upper <= stop_upper
+
+def test_auto_calibrate_skips_unresponsive(driver, tmp_path, capsys):
+    path = str(tmp_path / 'calibration.json')
+    updates = auto_calibrate(driver, {'front_left_knee': 2, 'back_right_knee': 8,
+                                      'front_right_hip': 3}, margin=2.0, path=path)
+    assert 'front_right_hip' not in updates
+    assert 'Not calibrated: front_right_hip' in capsys.readouterr().out
+    
+    # Found stops are narrowed by the margin; no stop never widens ANGLE_LIMITS (knee: 20-160)
+    saved = json.load(open(path))
+    assert saved['front_left_knee']['min'] == pytest.approx(45.36 + 2.0, abs=RESOLUTION + TOLERANCE)
+    assert saved['front_left_knee']['max'] == pytest.approx(159.84 - 2.0, abs=RESOLUTION + TOLERANCE)
+    assert saved['back_right_knee']['min'] == 20 and saved['back_right_knee']['max'] == 160
+    assert saved['front_right_hip']['min'] == 30 and saved['front_right_hip']['max'] == 150
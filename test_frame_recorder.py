@@ -0,0 +1,33 @@
+import os
+import numpy as np
+from frame_recorder import HEADER, FrameRecorder, load_recording
+
+def write_recording(path, frames):
+    recorder = FrameRecorder(str(path))
+    for i in range(frames):
+        recorder.record(i / frames, np.full((4, 2), i), np.full(8, 90.0 + i), np.full(8, 500 + i), 20)
+    recorder.close()
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'walk.rec'
+    write_recording(path, 5)
+    frames = load_recording(str(path))
+    assert len(frames) == 5
+    np.testing.assert_array_equal(frames['positions'][:, 0], [500, 501, 502, 503, 504])
+    assert np.all(frames['move_time'] == 20)
+
+def test_partial_last_record_is_ignored(tmp_path, capsys):
+    """A recorder killed mid-write leaves a partial record; the rest still loads"""
+    path = tmp_path / 'crash.rec'
+    write_recording(path, 5)
+    os.truncate(path, os.path.getsize(path) - 7)
+    frames = load_recording(str(path))
+    assert len(frames) == 4
+    np.testing.assert_array_equal(frames['positions'][:, 0], [500, 501, 502, 503])
+    assert 'partial record' in capsys.readouterr().out
+
+def test_header_only(tmp_path):
+    path = tmp_path / 'empty.rec'
+    write_recording(path, 0)
+    assert os.path.getsize(path) == HEADER.size
+    assert len(load_recording(str(path))) == 0
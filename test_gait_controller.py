@@ -0,0 +1,48 @@
+import pytest
+from gait_controller import GaitController
+from inverse_kinematics import JOINT_NAMES
+from joint_frame import JointFrame
+from lx16a_driver import LX16ADriver
+from robot_config import NEUTRAL_ANGLES
+
+@pytest.fixture
+def gait():
+    """Controller on the emulated bus, recording every frame handed to the driver"""
+    driver = LX16ADriver('emulator')
+    driver.frames = []
+    def set_positions(servo_ids, positions, move_time=1000, synchronized=False, count=None):
+        count = len(servo_ids) if count is None else count
+        driver.frames.append((list(servo_ids[:count]), list(positions[:count]), move_time))
+    driver.set_positions = set_positions
+    yield GaitController(driver)
+    driver.close()
+
+def test_dict_and_frame_send_the_same(gait):
+    angles = {name: NEUTRAL_ANGLES[name] + i for i, name in enumerate(JOINT_NAMES)}
+    gait.set_multiple(angles, 20)
+    gait.invalidate_commands()
+    gait.set_multiple(JointFrame().update(angles), 20)
+    assert gait.driver.frames[0] == gait.driver.frames[1]
+    assert len(gait.driver.frames[0][0]) == len(JOINT_NAMES)
+
+def test_delta_suppression(gait):
+    """Only changed joints are resent, by either path; set_servo counts as sent"""
+    frame = JointFrame().update(NEUTRAL_ANGLES)
+    gait.set_multiple(frame, 20)
+    gait.set_multiple(dict(NEUTRAL_ANGLES), 20)
+    assert len(gait.driver.frames) == 1
+    assert gait.commands_skipped == len(JOINT_NAMES)
+    
+    knee = NEUTRAL_ANGLES['front_left_knee'] + 10
+    gait.set_multiple(dict(NEUTRAL_ANGLES, front_left_knee=knee), 20)
+    gait.set_multiple(frame.update({'back_right_hip': NEUTRAL_ANGLES['back_right_hip'] + 10}), 20)
+    # The frame still has front_left_knee at neutral, so that joint is sent back too
+    assert [ids for ids, _, _ in gait.driver.frames[1:]] == [[2], [2, 7]]
+    
+    gait.set_servo('front_left_hip', NEUTRAL_ANGLES['front_left_hip'] + 10, 20)
+    gait.set_multiple(dict(front_left_hip=NEUTRAL_ANGLES['front_left_hip'] + 10), 20)
+    assert len(gait.driver.frames) == 3
+    
+    # A new move time resends everything
+    gait.set_multiple(frame, 40)
+    assert len(gait.driver.frames[-1][0]) == len(JOINT_NAMES)
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from robot_config import LEG_DIMENSIONS
+from inverse_kinematics import LegIK
+from ik_lookup import IKLookupTable
+
+@pytest.fixture(scope='module')
+def leg_ik():
+    """LegIK answering from a lookup table built in memory (not saved)"""
+    leg_ik = LegIK(LEG_DIMENSIONS['thigh_length'], LEG_DIMENSIONS['shin_length'])
+    leg_ik.use_lookup(IKLookupTable.build(leg_ik, resolution=1.0))
+    return leg_ik
+
+def test_lookup_within_error_bound(leg_ik):
+    """Interpolated angles stay within each cell's stated bound of the exact solution"""
+    rng = np.random.default_rng(0)
+    reach = leg_ik.total_length
+    x = rng.uniform(-reach, reach, 20000)
+    z = rng.uniform(0, reach, 20000)
+    
+    hip, knee, valid = leg_ik.lookup.interpolate(x, z)
+    exact_hip, exact_knee, _, _ = leg_ik.solve_angles_batch(x, z)
+    bound = leg_ik.lookup.error_at(x, z)
+    assert valid.sum() > len(x) // 2
+    assert np.all(np.abs(hip - exact_hip)[valid] <= bound[valid])
+    assert np.all(np.abs(knee - exact_knee)[valid] <= bound[valid])
+    assert np.all(bound[valid] <= 0.05)
+
+def test_batch_matches_exact(leg_ik):
+    """calculate_angles_batch: lookup where valid, exact solution everywhere else"""
+    reach = leg_ik.total_length
+    x = np.linspace(-reach * 1.2, reach * 1.2, 101)[None, :]
+    z = np.linspace(-10, reach * 1.2, 61)[:, None]
+    hip, knee, scaled, too_close = leg_ik.calculate_angles_batch(x, z)
+    exact_hip, exact_knee, exact_scaled, exact_too_close = leg_ik.solve_angles_batch(x, z)
+    assert hip.shape == exact_hip.shape == (61, 101)
+    np.testing.assert_allclose(hip, exact_hip, atol=leg_ik.lookup.max_error)
+    np.testing.assert_allclose(knee, exact_knee, atol=leg_ik.lookup.max_error)
+    np.testing.assert_array_equal(scaled, exact_scaled)
+    np.testing.assert_array_equal(too_close, exact_too_close)
+
+@pytest.mark.parametrize('x, z', [(200.0, 10.0), (10.0, 100.0), (0.0, 0.0)])
+def test_scalar_targets(leg_ik, x, z):
+    """Scalar targets, in or out of the table, come back like the exact solver's"""
+    hip, knee, scaled, too_close = leg_ik.calculate_angles_batch(x, z)
+    exact_hip, exact_knee, exact_scaled, exact_too_close = leg_ik.solve_angles_batch(x, z)
+    assert np.shape(hip) == np.shape(exact_hip) == ()
+    assert hip == pytest.approx(float(exact_hip), abs=leg_ik.lookup.max_error)
+    assert knee == pytest.approx(float(exact_knee), abs=leg_ik.lookup.max_error)
+    assert bool(scaled) == bool(exact_scaled)
+    assert bool(too_close) == bool(exact_too_close)
@@ -0,0 +1,90 @@
+import struct
+import threading
+import pytest
+from lx16a_driver import LX16ADriver, FrameEncoder, PacketParser, SERVO_POS_READ, build_packet
+from lx16a_emulator import EmulatedBus
+from robot_config import SERVO_MAP
+
+SERVO_IDS = list(SERVO_MAP.values())
+
+@pytest.fixture
+def driver():
+    """Driver on a fresh emulated bus (servo start times are measured on the wire)"""
+    driver = LX16ADriver('emulator')
+    yield driver
+    driver.close()
+
+@pytest.mark.parametrize('num_servos', [2, 4, 8])
+def test_unsynchronized_frame_skew(driver, num_servos):
+    """Each servo starts as its own packet arrives: (n-1) packet airtimes apart"""
+    ids = SERVO_IDS[:num_servos]
+    driver.set_positions(ids, [600] * num_servos, 100, synchronized=False)
+    
+    expected = (num_servos - 1) * driver.bus_time(FrameEncoder.MOVE_PACKET_SIZE)
+    assert driver.ser.start_skew(ids) == pytest.approx(expected, rel=1e-6)
+    assert driver.last_frame_skew == pytest.approx(driver.ser.start_skew(ids), rel=1e-6)
+
+@pytest.mark.parametrize('num_servos', [2, 4, 8])
+def test_synchronized_frame_skew(driver, num_servos):
+    """Wait-writes plus one broadcast start move every servo at the same instant"""
+    ids = SERVO_IDS[:num_servos]
+    driver.set_positions(ids, [600] * num_servos, 100, synchronized=True)
+    
+    assert driver.ser.start_skew(ids) == 0.0
+    assert driver.last_frame_skew == 0.0
+    assert set(driver.ser.start_times) == set(ids)
+
+def position_reply(servo_id, position):
+    return build_packet(servo_id, SERVO_POS_READ, struct.pack('<h', position))
+
+def test_parser_split_packets():
+    """Packets cut at every byte boundary come out whole, once"""
+    data = position_reply(1, 500) + position_reply(2, 321)
+    for split in range(1, len(data)):
+        parser = PacketParser()
+        packets = parser.feed(data[:split]) + parser.feed(data[split:])
+        assert packets == [(1, SERVO_POS_READ, struct.pack('<h', 500)),
+                           (2, SERVO_POS_READ, struct.pack('<h', 321))]
+        assert parser.discarded_bytes == 0
+
+def test_parser_bad_checksum_and_garbage():
+    """A corrupted packet is dropped and the parser resyncs on the next header"""
+    corrupted = bytearray(position_reply(1, 500))
+    corrupted[-1] ^= 0xFF
+    parser = PacketParser()
+    packets = parser.feed(b'\x00\x55\x12' + bytes(corrupted) + position_reply(2, 42))
+    assert packets == [(2, SERVO_POS_READ, struct.pack('<h', 42))]
+    assert parser.bad_checksums == 1
+    assert parser.discarded_bytes > 0
+
+def test_parser_echoed_request():
+    """A half-duplex adapter echoes the request: it parses as a packet without params"""
+    parser = PacketParser()
+    packets = parser.feed(build_packet(3, SERVO_POS_READ) + position_reply(3, 700))
+    assert packets == [(3, SERVO_POS_READ, b''), (3, SERVO_POS_READ, struct.pack('<h', 700))]
+
+def test_read_skips_echoed_requests():
+    driver = LX16ADriver('emulator', transport=EmulatedBus(echo=True))
+    positions = driver.read_positions(SERVO_IDS)
+    assert positions == {servo_id: 500 for servo_id in SERVO_IDS}
+
+def test_concurrent_reads(driver):
+    """Reads from several threads each get all of their own replies"""
+    for servo_id, servo in driver.ser.servos.items():
+        servo.start_position = servo.target = 100.0 + servo_id
+    
+    results = []
+    def reader(ids):
+        for _ in range(20):
+            results.append((ids, driver.read_positions(ids)))
+    
+    threads = [threading.Thread(target=reader, args=(ids,))
+               for ids in (SERVO_IDS[:4], SERVO_IDS[4:], SERVO_IDS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(results) == 60
+    for ids, positions in results:
+        assert positions == {servo_id: 100 + servo_id for servo_id in ids}
@@ -0,0 +1,108 @@
+import struct
+import time
+import pytest
+from lx16a_driver import (
+    LX16ADriver, build_packet, BROADCAST_ID, SERVO_MOVE_TIME_WAIT_WRITE, SERVO_MOVE_START,
+    SERVO_MOVE_TIME_WRITE, SERVO_TORQUE_OFF
+)
+from lx16a_emulator import EmulatedBus, EmulatedServo
+from robot_config import SERVO_MAP
+
+SERVO_IDS = list(SERVO_MAP.values())
+
+@pytest.fixture
+def driver():
+    driver = LX16ADriver('emulator')
+    yield driver
+    driver.close()
+
+def move_params(position, move_time):
+    return struct.pack('<HH', move_time, position)
+
+def test_servo_interpolates_over_move_time():
+    servo = EmulatedServo(1, position=500)
+    servo.move(10.0, 700, 1000)
+    assert servo.position_at(9.9) == 500
+    assert servo.position_at(10.0) == 500
+    assert servo.position_at(10.25) == pytest.approx(550)
+    assert servo.position_at(10.5) == pytest.approx(600)
+    assert servo.position_at(11.0) == 700
+    assert servo.position_at(12.0) == 700
+
+def test_retarget_mid_move_starts_from_current_position():
+    servo = EmulatedServo(1, position=500)
+    servo.move(0.0, 700, 1000)
+    servo.move(0.5, 400, 1000)
+    assert servo.position_at(0.5) == pytest.approx(600)
+    assert servo.position_at(1.0) == pytest.approx(500)
+    assert servo.position_at(1.5) == 400
+
+def test_servo_stops_at_physical_limits():
+    servo = EmulatedServo(1, position=500, min_position=200, max_position=800)
+    servo.move(0.0, 1000, 0)
+    assert servo.position_at(0.1) == 800
+    servo.move(1.0, 0, 0)
+    assert servo.position_at(1.1) == 200
+
+def test_position_readback(driver):
+    """Positions read over the protocol follow commanded moves"""
+    assert driver.read_positions(SERVO_IDS) == {servo_id: 500 for servo_id in SERVO_IDS}
+    driver.set_positions(SERVO_IDS, [100 * i for i in range(1, 9)], 0)
+    assert driver.read_positions(SERVO_IDS) == {servo_id: 100 * i
+                                                for i, servo_id in enumerate(SERVO_IDS, 1)}
+
+def test_readback_during_move(driver):
+    driver.set_positions([1], [900], 300)
+    start = driver.ser.start_times[1]
+    position = driver.read_position(1)
+    elapsed = time.monotonic() - start
+    # Read at some point after the move started, before it finished
+    assert 500 <= position < 900
+    assert position <= 500 + 400 * elapsed / 0.3 + 1
+    time.sleep(0.35)
+    assert driver.read_position(1) == 900
+
+def test_other_reads(driver):
+    assert driver.read_voltage(1) == 7400
+    assert driver.read_temperature(1) == 35
+    assert driver.read_id(1) == 1
+    assert driver.read_position(99, timeout=0.01) is None
+
+def test_wait_write_moves_only_on_start():
+    """Wait-writes are held until the broadcast move start, then all start at once"""
+    bus = EmulatedBus()
+    for servo_id, position in ((1, 600), (2, 700)):
+        bus.write(build_packet(servo_id, SERVO_MOVE_TIME_WAIT_WRITE, move_params(position, 0)))
+    time.sleep(0.01)
+    assert bus.positions()[1] == 500 and bus.positions()[2] == 500
+    assert bus.start_times == {}
+    
+    bus.write(build_packet(BROADCAST_ID, SERVO_MOVE_START))
+    time.sleep(0.01)
+    assert bus.positions()[1] == 600 and bus.positions()[2] == 700
+    assert bus.start_times[1] == bus.start_times[2]
+    assert bus.start_skew([1, 2]) == 0.0
+    
+    # A second start without new wait-writes moves nothing
+    bus.write(build_packet(BROADCAST_ID, SERVO_MOVE_START))
+    assert bus.positions()[1] == 600
+
+def test_packets_take_effect_when_received():
+    """Each packet acts once its last byte is off the wire"""
+    bus = EmulatedBus(baudrate=115200)
+    frame = b''.join(build_packet(servo_id, SERVO_MOVE_TIME_WRITE, move_params(600, 0))
+                     for servo_id in (1, 2, 3))
+    bus.write(frame)
+    assert bus.start_times[2] - bus.start_times[1] == pytest.approx(bus.byte_time(10))
+    assert bus.start_times[3] - bus.start_times[1] == pytest.approx(bus.byte_time(20))
+
+def test_torque_off_holds_position():
+    bus = EmulatedBus()
+    bus.write(build_packet(1, SERVO_MOVE_TIME_WRITE, move_params(900, 1000)))
+    time.sleep(0.1)
+    bus.write(build_packet(1, SERVO_TORQUE_OFF))
+    held = bus.positions()[1]
+    time.sleep(0.1)
+    assert 500 < held < 900
+    assert bus.positions()[1] == held
+    assert not bus.servos[1].torque
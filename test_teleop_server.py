@@ -0,0 +1,41 @@
+import json
+import math
+import pytest
+from teleop_server import COMMAND, COMMAND_MAGIC, decode_command, encode_command, is_newer
+
+def test_binary_round_trip():
+    command = decode_command(encode_command(7, 1.5, -0.25, 110.0, 'walk', stop=False))
+    assert command['seq'] == 7
+    assert command['speed'] == 1.5
+    assert command['turn_rate'] == -0.25
+    assert command['body_height'] == 110.0
+    assert command['gait'] == 'walk'
+    assert not command['stop']
+
+def test_binary_unchanged_setpoints():
+    """A height- or gait-only packet must not change speed or turn rate"""
+    command = decode_command(encode_command(1, body_height=100.0, gait='trot'))
+    assert command['speed'] is None
+    assert command['turn_rate'] is None
+    assert command['body_height'] == 100.0
+
+@pytest.mark.parametrize('values', [
+    (math.inf, 0.0, math.nan),
+    (0.0, -math.inf, math.nan),
+    (0.0, 0.0, math.inf)
+])
+def test_binary_non_finite_is_malformed(values):
+    with pytest.raises(ValueError):
+        decode_command(COMMAND.pack(COMMAND_MAGIC, 1, *values, 0))
+
+@pytest.mark.parametrize('field', ['speed', 'turn_rate', 'body_height'])
+@pytest.mark.parametrize('value', [math.nan, math.inf])
+def test_json_non_finite_is_malformed(field, value):
+    with pytest.raises(ValueError):
+        decode_command(json.dumps({'seq': 1, field: value}).encode())
+
+def test_sequence_wraparound():
+    assert is_newer(0, (1 << 32) - 1)
+    assert is_newer(6, 5)
+    assert not is_newer(5, 5)
+    assert not is_newer(0, 500)
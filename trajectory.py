@@ -0,0 +1,61 @@
+from math import comb
+import numpy as np
+
+class BezierTrajectory:
+    # 12-point swing curve, x in units of step_length, z in units of step_height
+    # (z positive down like LegIK). The doubled end points make the swing leave and
+    # land with the stance velocity and no vertical speed, so the path has no
+    # velocity jump at liftoff or touchdown.
+    SWING_X = (-0.5, -0.5 - 1/11, -0.7, -0.7, -0.7, 0.0, 0.0, 0.0, 0.7, 0.7, 0.5 + 1/11, 0.5)
+    SWING_Z = (0.0, 0.0, -1.0, -1.0, -1.0, -1.2, -1.2, -1.2, -1.0, -1.0, 0.0, 0.0)
+    
+    def __init__(self, step_length=40, step_height=20):
+        """
+        Smooth foot trajectory: Bezier swing (phase 0-0.5), linear stance (0.5-1)
+        Coefficients are computed once; evaluation is vectorized over phases.
+        """
+        self.step_length = step_length
+        self.step_height = step_height
+        
+        basis = self.power_basis(len(self.SWING_X) - 1)
+        self.x_coeffs = basis @ (np.array(self.SWING_X) * step_length)
+        z_coeffs = basis @ np.array(self.SWING_Z)
+        
+        # Scale z so the swing peaks at exactly step_height
+        peak = -np.min(self._polyval(z_coeffs, np.linspace(0, 1, 1001)))
+        self.z_coeffs = z_coeffs * (step_height / peak if peak > 0 else 0.0)
+    
+    @staticmethod
+    def power_basis(degree):
+        """Matrix mapping Bezier control points to polynomial coefficients (constant first)"""
+        n = degree
+        basis = np.zeros((n + 1, n + 1))
+        for k in range(n + 1):
+            for i in range(k + 1):
+                basis[k, i] = comb(n, k) * comb(k, i) * (-1) ** (k - i)
+        return basis
+    
+    @staticmethod
+    def _polyval(coeffs, s):
+        """Horner evaluation of constant-first coefficients over an array"""
+        result = np.full_like(s, coeffs[-1])
+        for c in coeffs[-2::-1]:
+            result = result * s + c
+        return result
+    
+    def evaluate(self, phase):
+        """
+        Foot position for phase 0 to 1 (array or scalar)
+        Returns: (x, z) arrays in mm, same conventions as LegIK.foot_trajectory
+        """
+        phase = np.asarray(phase, dtype=float) % 1.0
+        swing = phase < 0.5
+        
+        s = np.where(swing, phase * 2, 0.0)
+        swing_x = self._polyval(self.x_coeffs, s)
+        swing_z = self._polyval(self.z_coeffs, s)
+        
+        stance_x = self.step_length/2 - self.step_length * (phase - 0.5) * 2
+        x = np.where(swing, swing_x, stance_x)
+        z = np.where(swing, swing_z, 0.0)
+        return x, z